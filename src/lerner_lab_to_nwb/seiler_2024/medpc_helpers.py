@@ -1,3 +1,8 @@
+import mmap
+import os
+import re
+from functools import lru_cache
+
 import numpy as np
 
 from neuroconv.utils import FilePathType
@@ -19,13 +24,18 @@ def get_medpc_variables(file_path: FilePathType, variable_names: list) -> dict:
     dict
         A dictionary with the variable names as keys and a list of variable values as values.
     """
-    with open(file_path, "r") as f:
-        lines = f.readlines()
     medpc_variables = {name: [] for name in variable_names}
-    for line in lines:
-        for variable_name in variable_names:
-            if line.startswith(variable_name):
-                medpc_variables[variable_name].append(line.split(":", maxsplit=1)[1].strip())
+    if not variable_names:
+        return medpc_variables
+    # A single regex pass over the raw bytes finds the variable lines without decoding the array data in between
+    variable_names_pattern = b"|".join(re.escape(name.encode()) for name in variable_names)
+    variable_pattern = re.compile(rb"^(" + variable_names_pattern + rb")[^:\n]*:([^\n]*)", re.MULTILINE)
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # empty files cannot be memory-mapped
+            return medpc_variables
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as medpc_file:
+            for match in variable_pattern.finditer(medpc_file):
+                medpc_variables[match.group(1).decode()].append(match.group(2).decode().strip())
     return medpc_variables
 
 
@@ -84,6 +94,86 @@ def get_session_lines(lines: list, session_conditions: dict, start_variable: str
     return session_lines
 
 
+def index_session_lines(lines: list, start_variable: str) -> list:
+    """
+    Index the sessions of a MedPC file in a single pass, so that many sessions can be found without re-scanning it.
+
+    Parameters
+    ----------
+    lines : list
+        The lines of the MedPC file.
+    start_variable : str
+        The name of the variable that starts the session (ex. 'Start Date').
+
+    Returns
+    -------
+    list
+        A list with one (header_lines, start_line, end_line) tuple per session in the order they appear in the file.
+        header_lines is the set of stripped lines of the session, excluding the rows of multiline variables (which
+        start with a digit), start_line is the index of the session's start variable line (None if it is missing), and
+        end_line is the index of the blank line that ends the session. See find_session_lines.
+    """
+    session_index = []
+    header_lines, start_line = set(), None
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line.startswith(f"{start_variable}:"):
+            start_line = i
+        if line == "":
+            if header_lines:
+                session_index.append((header_lines, start_line, i))
+            header_lines, start_line = set(), None
+        elif not line[0].isdigit():
+            header_lines.add(line)
+    if header_lines:  # the last session is not always followed by a blank line
+        session_index.append((header_lines, start_line, len(lines)))
+    return session_index
+
+
+def find_session_lines(lines: list, session_index: list, session_conditions: dict, start_variable: str) -> list:
+    """
+    Get the lines for a session from a MedPC file using its session index.
+
+    This returns the same lines as get_session_lines, without re-scanning the file.
+
+    Parameters
+    ----------
+    lines : list
+        The lines of the MedPC file.
+    session_index : list
+        The session index of the MedPC file (see index_session_lines).
+    session_conditions : dict
+        The conditions that define the session. The keys are the names of the single-line variables (ex. 'Start Date')
+        and the values are the values of those variables for the desired session (ex. '11/09/18').
+    start_variable : str
+        The name of the variable that starts the session (ex. 'Start Date').
+
+    Returns
+    -------
+    list
+        The lines for the session.
+
+    Raises
+    ------
+    ValueError
+        If the session with the given conditions could not be found.
+    ValueError
+        If the start variable of the session with the given conditions could not be found.
+    """
+    condition_lines = {
+        f"{condition_name}: {condition_value}" for condition_name, condition_value in session_conditions.items()
+    }
+    for header_lines, start_line, end_line in session_index:
+        if not condition_lines.issubset(header_lines):
+            continue
+        if start_line is None:
+            raise ValueError(
+                f"Could not find the start variable ({start_variable}) of the session with conditions {session_conditions}"
+            )
+        return lines[start_line:end_line]
+    raise ValueError(f"Could not find the session with conditions {session_conditions}")
+
+
 def read_medpc_file(
     file_path: FilePathType,
     medpc_name_to_info_dict: dict,
@@ -92,6 +182,8 @@ def read_medpc_file(
 ) -> dict:
     """Read a single session from a raw MedPC text file into a dictionary.
 
+    The file is read and indexed once per process and version of the file (see get_medpc_file_session_index).
+
     Parameters
     ----------
     file_path : FilePathType
@@ -116,10 +208,64 @@ def read_medpc_file(
     ValueError
         If the session with the given conditions could not be found.
     """
+    stat = os.stat(file_path)
+    lines, session_index = get_medpc_file_session_index(
+        file_path=os.fspath(file_path), mtime_ns=stat.st_mtime_ns, size=stat.st_size, start_variable=start_variable
+    )
+    session_lines = find_session_lines(
+        lines, session_index=session_index, session_conditions=session_conditions, start_variable=start_variable
+    )
+    return parse_session_lines(session_lines=session_lines, medpc_name_to_info_dict=medpc_name_to_info_dict)
+
+
+@lru_cache(maxsize=64)
+def get_medpc_file_session_index(*, file_path: str, mtime_ns: int, size: int, start_variable: str) -> tuple:
+    """
+    Read a MedPC file and index its sessions, caching the result for each version of the file.
+
+    The same MedPC file is read by several interfaces during a conversion, and for many sessions during the dataset
+    scans, so it is only read and indexed once per process as long as it is not modified.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the MedPC file.
+    mtime_ns : int
+        The modification time of the file in ns.
+    size : int
+        The size of the file in bytes.
+    start_variable : str
+        The name of the variable that starts the session (ex. 'Start Date').
+
+    Returns
+    -------
+    lines : list
+        The lines of the MedPC file. The list must not be modified.
+    session_index : list
+        The session index of the MedPC file (see index_session_lines).
+    """
     with open(file_path, "r") as f:
         lines = f.readlines()
-    session_lines = get_session_lines(lines, session_conditions=session_conditions, start_variable=start_variable)
+    return lines, index_session_lines(lines, start_variable=start_variable)
+
+
+def parse_session_lines(session_lines: list, medpc_name_to_info_dict: dict) -> dict:
+    """Parse the lines of a single session from a MedPC file into a dictionary.
 
+    Parameters
+    ----------
+    session_lines : list
+        The lines for the session (see get_session_lines).
+    medpc_name_to_info_dict : dict
+        A dictionary where the keys are the MedPC variable names and the values are dictionaries with the keys 'name' and
+        'is_array'. 'name' is the name of the variable in the output dictionary and 'is_array' is a boolean indicating
+        whether the variable is an array.  Ex. {'Start Date': {'name': 'start_date', 'is_array': False}}
+
+    Returns
+    -------
+    dict
+        A dictionary with the variable names as keys and the data extracted from medpc output are the values.
+    """
     # Parse the session lines into a dictionary
     session_dict = {}
     for i, line in enumerate(session_lines):
@@ -140,13 +286,8 @@ def read_medpc_file(
                     session_dict[output_name] = []
             if multiline_variable_name not in medpc_name_to_info_dict:
                 continue
-            data = data.split(" ")
-            for datum in data:
-                datum = datum.strip()
-                if datum == "":
-                    continue
-                output_name = medpc_name_to_info_dict[multiline_variable_name]["name"]
-                session_dict[output_name].append(datum)
+            output_name = medpc_name_to_info_dict[multiline_variable_name]["name"]
+            session_dict[output_name].extend(datum for datum in map(str.strip, data.split(" ")) if datum != "")
 
         # single line variable
         elif medpc_name in medpc_name_to_info_dict:
@@ -167,7 +308,26 @@ def read_medpc_file(
                     )
                 else:
                     session_dict[output_name] = np.array(session_dict[output_name], dtype=float)
-                    session_dict[output_name] = np.trim_zeros(
-                        session_dict[output_name], trim="b"
-                    )  # MEDPC adds extra zeros to the end of the array
+                    # MEDPC adds extra zeros to the end of the array
+                    session_dict[output_name] = trim_trailing_zeros(session_dict[output_name])
     return session_dict
+
+
+def trim_trailing_zeros(array: np.ndarray) -> np.ndarray:
+    """Remove the trailing zeros from a 1D array.
+
+    Equivalent to np.trim_zeros(array, trim="b"), but vectorized: np.trim_zeros walks back from the end of the array
+    in python on older versions of numpy.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The 1D array to trim.
+
+    Returns
+    -------
+    np.ndarray
+        A view of the array up to and including its last nonzero element.
+    """
+    nonzero_indices = np.flatnonzero(array)
+    return array[: nonzero_indices[-1] + 1 if nonzero_indices.size else 0]
@@ -31,12 +31,15 @@ The get_opto_header_variables() function obtains a group of header variables for
 The rest of the functions defined in this script are relatively self-explanatory helpers with their own documentation.
 
 Note that the dataset conversion uses multiprocessing, currently set to 4 workers.  To use more or fewer workers, simply
-change the `max_workers` argument to `dataset_to_nwb()`.
+change the `max_workers` argument to `dataset_to_nwb()` (by default, one worker per CPU core is used).
 """
 from pathlib import Path
-from typing import Union
+from typing import Union, Optional
+from collections import namedtuple, defaultdict
+from functools import partial, lru_cache
+from itertools import islice, repeat
+import os
 from tqdm import tqdm
-from datetime import datetime
 import shutil
 import pandas as pd
 import numpy as np
@@ -45,20 +48,198 @@ from pprint import pformat
 import traceback
 import re
 import yaml
+import pickle
 
 from lerner_lab_to_nwb.seiler_2024.seiler_2024_convert_session import (
     session_to_nwb,
     western_blot_to_nwb,
     split_western_blot,
 )
-from lerner_lab_to_nwb.seiler_2024.medpc_helpers import get_medpc_variables, read_medpc_file
+from lerner_lab_to_nwb.seiler_2024.medpc_helpers import (
+    get_medpc_variables,
+    read_medpc_file,
+    trim_trailing_zeros,
+)
+
+SessionRow = namedtuple("SessionRow", ["start_date", "start_time", "msn", "file_path", "subject", "box_number"])
+PORT_ENTRY_TIMES_MEDPC_NAME_TO_INFO_DICT = {"G": {"name": "port_entry_times", "is_array": True}}
+# Persisted between runs by load_fp_matching_cache and save_fp_matching_cache
+SUBJECT_DIR_TO_CSV_SESSION_DATES = {}
+RAW_SESSION_TO_PORT_ENTRY_TIMES = {}
+# (subject_to_raw_sessions, date_to_raw_sessions) in the worker processes of get_session_rows_per_subject_dir
+FP_HEADER_WORKER_RAW_SESSION_INDICES = None
+# (subject_id, start_date, msn) of photometry sessions that were accidentally run on the wrong MSN and should be skipped
+WRONG_MSN_FP_SESSIONS = frozenset(
+    {
+        ("271.396", "07/07/20", "FOOD_RI 60 RIGHT TTL"),
+        ("88.239", "02/19/19", "FOOD_RI 60 LEFT TTL"),
+    }
+)
+# (subject_id, start_date, experimental_subgroup) of photometry sessions to skip, where a subgroup of None matches any
+FP_SESSIONS_TO_SKIP = frozenset(
+    {
+        ("334.394", "07/21/20", None),  # Skipping this session bc photometry data is corrupted
+        ("99.257", "04/16/19", None),  # Skipping this session bc missing behavior data
+        # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_64_205-181017-094913
+        ("64.205", "10/17/18", "Late"),
+        # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_81_236-190117-102128
+        ("81.236", "01/17/19", "Late"),
+        # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_87_239-190228-111317
+        ("87.239", "02/28/19", "Late"),
+        # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_88_239-190219-140027
+        ("88.239", "02/19/19", "Late"),
+        # This session is a duplicate of Delayed Punishment Resistant/Early RI 60/Photo_80_236-190121-093425
+        ("80.236", "01/21/19", "Late RI60"),
+        # This session is a duplicate of Punishment Sensitive/Early RI60/Photo_75_214-181029-124815
+        ("75.214", "10/29/18", "Late RI60"),
+        # This session is a duplicate of Punishment Sensitive/Early RI60/Photo_93_246-190222-130128
+        ("93.246", "02/22/19", "Late RI60"),
+        # This session is a duplicate of Punishment Sensitive/Early RI60/Photo_78_214-181031-131820
+        ("78.214", "10/31/18", "Late RI60"),
+        ("96.259", "05/06/19", "late"),  # This session is missing RNnR TTLs
+    }
+)
+# Photometry sessions whose demodulated commanded voltages are stored in Fi1r rather than in a dedicated Fi1d array
+FI1R_ONLY_SESSIONS = frozenset(
+    {
+        "Photo_333_393-200713-121027",
+        "Photo_346_394-200707-141513",
+        "Photo_64_205-181017-094913",
+        "Photo_81_236-190117-102128",
+        "Photo_87_239-190228-111317",
+        "Photo_81_236-190207-101451",
+        "Photo_87_239-190321-110120",
+        "Photo_88_239-190311-112034",
+        "Photo_333_393-200729-115506",
+        "Photo_346_394-200722-132345",
+        "Photo_349_393-200717-123319",
+        "Photo_111_285-190605-142759",
+        "Photo_141_308-190809-143410",
+        "Photo_80_236-190121-093425",
+        "Photo_61_207-181017-105639",
+        "Photo_63_207-181015-093910",
+        "Photo_63_207-181030-103332",
+        "Photo_89_247-190328-125515",
+        "Photo_028_392-200724-130323",
+        "Photo_048_392-200728-121222",
+        "Photo_112_283-190620-093542",
+        "Photo_113_283-190605-115438",
+        "Photo_114_273-190607-140822",
+        "Photo_115_273-190611-115654",
+        "Photo_139_298-190809-132427",
+        "Photo_75_214-181029-124815",
+        "Photo_92_246-190227-143210",
+        "Photo_92_246-190227-150307",
+        "Photo_93_246-190222-130128",
+        "Photo_78_214-181031-131820",
+        "Photo_90_247-190328-103249",
+        "Photo_92_246-190228-132737",
+        "Photo_92_246-190319-114357",
+        "Photo_94_246-190328-113641",
+        "Photo_140_306-190903-102551",
+        "Photo_271_396-200722-121638",
+        "Photo_347_393-200723-113530",
+        "Photo_348_393-200730-113125",
+        "Photo_139_298-190912-095034",
+        "Photo_88_239-190219-140027",
+        "Photo_89_247-190308-095258",
+        "Photo_140_306-190809-121107",
+        "Photo_271_396-200707-125117",
+        "Photo_96_259-190417-160333",
+        "Photo_97_257-190417-134643",
+        "Photo_97_257-190506-120133",
+        "Photo_98_257-190424-114024",
+        "Photo_98_257-190510-095056",
+        "Photo_99_257-190506-130951",
+        "Photo_100_258-190423-122632",
+        "Photo_100_258-190509-133212",
+        "Photo_101_260-190425-120029",
+    }
+)
+# Sessions whose photometry recording was split across two folders
+FIRST_TO_SECOND_FIBER_PHOTOMETRY_FOLDER_NAME = {
+    "Photo_139_298-190912-095034": "Photo_139_298-190912-103544",
+    "Photo_332_393-200728-122403": "Photo_332_393-200728-123314",
+    "Photo_92_246-190227-143210": "Photo_92_246-190227-150307",
+}
+SECOND_FIBER_PHOTOMETRY_FOLDER_NAMES = frozenset(FIRST_TO_SECOND_FIBER_PHOTOMETRY_FOLDER_NAME.values())
+FIBER_PHOTOMETRY_FOLDER_NAME_TO_T2 = {"Photo_139_298-190912-095034": 2267.0}
+MSNS_TO_SKIP = frozenset(
+    {
+        "RR10_Right_AHJS",
+        "Magazine Training 1 hr",
+        "FOOD_Magazine Training 1 hr",
+        "RI_60_Left_Probability_AH_050619",
+        "RI_60_Right_Probability_AH_050619",
+        "Extinction - 1 HR",
+        "RR10_Left_AHJS",
+        "Probe Test Habit Training CC",
+        "FOOD_FR1 Hapit Training TTL",
+        "RK_C_FR1_BOTH_1hr",
+        "Footshock_Right_Stim",
+        "Footshock_Left_Stim",
+        "ICSS_Right",
+        "RI_60_Right_Probability_AH_FINAL",
+        "RI_60_Left_Probability_AH_FINAL",
+        "PelletStimD_Right",
+        "PelletStimD_Left",
+        "PelletStimBoth",
+    }
+)
+# (start_date, start_time, subject_id, msn) of individual sessions to skip
+SESSIONS_TO_SKIP = frozenset(
+    {
+        # This session is actually from subject 144.306, which should be skipped
+        ("09/20/19", "09:42:54", "139.298", "RI 60 RIGHT STIM"),
+        # This session is actually from subject 334, which should be skipped
+        ("07/28/20", "13:21:15", "272.396", "Probe Test Habit Training TTL"),
+        # This session is actually from subject 333, which should be skipped
+        ("07/31/20", "12:03:31", "346.394", "FOOD_RI 60 RIGHT TTL"),
+        # This session is only 2 mins long and has no behavioral data (likely an error)
+        ("06/16/20", "11:59:32", "028.392", "FOOD_FR1 HT TTL (Both)"),
+    }
+)
+# (start_date, start_time, subject_id) of individual sessions to skip regardless of their msn
+SESSION_STARTS_TO_SKIP = frozenset(
+    {
+        ("02/25/19", "11:08:22", "87.239"),  # This session is <1min long and has no behavioral data (likely an error)
+        ("03/12/19", "14:27:00", "88.239"),  # This session is 13min long and has no behavioral data (likely an error)
+        ("03/14/19", "10:52:10", "88.239"),  # This session is <1min long and has no behavioral data (likely an error)
+        ("02/08/19", "12:49:58", "80.236"),  # This session is <1min long and has no behavioral data (likely an error)
+        ("03/15/19", "10:20:33", "89.247"),  # This session is <1min long and has no behavioral data (likely an error)
+        ("06/25/19", "11:06:21", "111.285"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("02/17/19", "14:35:42", "90.247"),  # This session is <1min long and has no behavioral data (likely an error)
+        ("03/20/19", "14:02:22", "92.246"),  # This session is <5min long and has no behavioral data (likely an error)
+        ("03/01/19", "15:15:07", "92.246"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("03/15/19", "13:43:48", "93.246"),  # This session is <1min long and has no behavioral data (likely an error)
+        ("02/26/19", "16:48:27", "93.246"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("06/10/19", "12:26:59", "110.271"),  # This session is <2min long and has no behavioral data (likely an error)
+        ("06/25/19", "12:58:56", "112.283"),  # This session is <8min long and has no behavioral data (likely an error)
+        ("06/05/19", "10:32:25", "112.283"),
+        ("05/31/19", "10:21:31", "112.283"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("07/26/19", "12:20:57", "113.283"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("06/28/19", "08:51:30", "115.273"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("06/12/19", "11:56:29", "115.273"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("09/13/19", "10:01:57", "139.298"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("08/10/19", "13:57:04", "139.298"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("05/14/19", "11:35:01", "98.257"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("07/13/20", "12:10:51", "239.388"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("07/26/19", "11:32:18", "117.279"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("07/10/19", "14:42:46", "117.279"),  # This session is <10min long and has no behavioral data (likely an error)
+        ("05/21/19", "12:55:19", "479"),  # This session is <10min long and has no behavioral data (likely an error)
+    }
+)
 
 
 def dataset_to_nwb(
     *,
     data_dir_path: Union[str, Path],
     output_dir_path: Union[str, Path],
-    max_workers: int = 1,
+    cache_dir_path: Optional[Union[str, Path]] = None,
+    max_workers: Optional[int] = None,
+    sessions_per_pool: Optional[int] = None,
+    sessions_per_task: int = 1,
+    skip_existing: bool = False,
     stub_test: bool = False,
     verbose: bool = True,
 ):
@@ -70,6 +251,23 @@ def dataset_to_nwb(
         The path to the directory containing the raw data.
     output_dir_path : Union[str, Path]
         The path to the directory where the NWB files will be saved.
+    cache_dir_path : Union[str, Path], optional
+        The path to the directory where the raw MedPC file headers and the csv session matching tables are cached
+        between runs (see fp_to_nwb), by default None (nothing is cached). It should not be inside data_dir_path or
+        output_dir_path.
+    max_workers : int, optional
+        The number of worker processes used to convert sessions (and to parse the MedPC headers) in parallel, by
+        default None (one per CPU core).
+    sessions_per_pool : int, optional
+        The number of sessions converted by each pool before it is shut down and replaced by a fresh one, by default
+        None (a single pool converts every session). Recycling the workers bounds the memory they accumulate over a
+        long conversion.
+    sessions_per_task : int, optional
+        The number of sessions sent to a worker at once, by default 1. Larger chunks amortize the cost of sending
+        the arguments to the worker processes, at the cost of coarser load balancing between workers.
+    skip_existing : bool, optional
+        Whether to skip sessions whose NWB file in output_dir_path is up to date with its sources (see
+        session_to_nwb), by default False
     stub_test : bool, optional
         Whether to run a stub test, by default False
     verbose : bool, optional
@@ -95,10 +293,14 @@ def dataset_to_nwb(
     start_variable = "Start Date"
     data_dir_path = Path(data_dir_path)
     output_dir_path = Path(output_dir_path)
+    if cache_dir_path is not None:
+        cache_dir_path = Path(cache_dir_path)
     fp_session_to_nwb_args_per_session = fp_to_nwb(
         data_dir_path=data_dir_path,
         output_dir_path=output_dir_path,
         start_variable=start_variable,
+        cache_dir_path=cache_dir_path,
+        max_workers=max_workers,
         stub_test=stub_test,
         verbose=verbose,
     )
@@ -124,31 +326,32 @@ def dataset_to_nwb(
         subject_id = session_to_nwb_kwargs["subject_id"]
         if subject_id in subjects_to_skip:
             continue
+        session_to_nwb_kwargs["skip_existing"] = skip_existing
         session_to_nwb_args_per_session.append(session_to_nwb_kwargs)
 
-    futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for session_to_nwb_kwargs in session_to_nwb_args_per_session:
-            experiment_type = session_to_nwb_kwargs["experiment_type"]
-            experimental_group = session_to_nwb_kwargs["experimental_group"]
-            subject_id = session_to_nwb_kwargs["subject_id"]
-            optogenetic_treatment = session_to_nwb_kwargs.get("optogenetic_treatment", None)
-            if experiment_type == "FP":
-                exception_file_path = output_dir_path / f"ERROR_{experiment_type}_{experimental_group}_{subject_id}.txt"
-            elif experiment_type == "Opto":
-                exception_file_path = (
-                    output_dir_path
-                    / f"ERROR_{experiment_type}_{experimental_group}_{optogenetic_treatment}_{subject_id}.txt"
-                )
-            futures.append(
-                executor.submit(
-                    safe_session_to_nwb,
-                    session_to_nwb_kwargs=session_to_nwb_kwargs,
-                    exception_file_path=exception_file_path,
-                )
-            )
-        for _ in tqdm(as_completed(futures), total=len(futures)):
-            pass
+    # Create the output directories once up front (the ERROR_*.txt files are also written here)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
+    if stub_test:
+        (output_dir_path / "nwb_stub").mkdir(exist_ok=True)
+
+    # Each batch of sessions gets a fresh pool so that worker processes (and any memory they hold on to) are recycled
+    batch_size = sessions_per_pool or max(len(session_to_nwb_args_per_session), 1)
+    with tqdm(total=len(session_to_nwb_args_per_session)) as progress_bar:
+        for batch_start in range(0, len(session_to_nwb_args_per_session), batch_size):
+            batch = session_to_nwb_args_per_session[batch_start : batch_start + batch_size]
+            future_to_num_sessions = {}
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for chunk_start in range(0, len(batch), sessions_per_task):
+                    chunk = batch[chunk_start : chunk_start + sessions_per_task]
+                    future = executor.submit(
+                        safe_sessions_to_nwb, session_to_nwb_args_per_session=chunk, output_dir_path=output_dir_path
+                    )
+                    future_to_num_sessions[future] = len(chunk)
+                for future in as_completed(future_to_num_sessions):
+                    num_sessions = future_to_num_sessions.pop(future)  # sessions to advance the progress bar by
+                    # Conversion errors are recorded by safe_session_to_nwb, so this only raises if the worker failed
+                    future.result()
+                    progress_bar.update(num_sessions)
 
 
 def get_no_port_entry_duration_sessions(
@@ -178,33 +381,26 @@ def get_no_port_entry_duration_sessions(
             no_port_entry_duration_sessions = yaml.safe_load(f)
         return no_port_entry_duration_sessions
 
+    csv_name_to_dict_name = {
+        "DurationOfPE": "duration_of_port_entry",
+    }
+    # MedPC port entry durations are read from E, falling back to U if E cannot be read
+    medpc_name_to_info_dict = {"E": {"name": "duration_of_port_entry", "is_array": True}}
+    fallback_medpc_name_to_info_dict = {"U": {"name": "duration_of_port_entry", "is_array": True}}
     no_port_entry_duration_sessions = set()
     for session_to_nwb_kwargs in tqdm(session_to_nwb_args_per_session, desc="Reading port entry durations"):
         behavior_file_path = session_to_nwb_kwargs["behavior_file_path"]
         session_key = get_session_key_from_kwargs(session_to_nwb_kwargs)
 
         if behavior_file_path.suffix == ".csv":
-            csv_name_to_dict_name = {
-                "DurationOfPE": "duration_of_port_entry",
-            }
-            session_dtypes = {
-                "Start Date": str,
-                "End Date": str,
-                "Start Time": str,
-                "End Time": str,
-                "MSN": str,
-                "Experiment": str,
-                "Subject": str,
-                "Box": str,
-            }
-            session_df = pd.read_csv(behavior_file_path, dtype=session_dtypes)
+            # Only the port entry duration column is needed, so the other columns are never parsed
+            session_df = pd.read_csv(behavior_file_path, usecols=list(csv_name_to_dict_name))
             session_dict = {}
             for csv_name, dict_name in csv_name_to_dict_name.items():
-                session_dict[dict_name] = np.trim_zeros(session_df[csv_name].dropna().values, trim="b")
+                session_dict[dict_name] = trim_trailing_zeros(session_df[csv_name].dropna().values)
         else:
             session_conditions = session_to_nwb_kwargs["session_conditions"]
             start_variable = session_to_nwb_kwargs["start_variable"]
-            medpc_name_to_info_dict = {"E": {"name": "duration_of_port_entry", "is_array": True}}
             try:
                 session_dict = read_medpc_file(
                     file_path=behavior_file_path,
@@ -213,10 +409,9 @@ def get_no_port_entry_duration_sessions(
                     start_variable=start_variable,
                 )
             except TypeError:
-                medpc_name_to_info_dict = {"U": {"name": "duration_of_port_entry", "is_array": True}}
                 session_dict = read_medpc_file(
                     file_path=behavior_file_path,
-                    medpc_name_to_info_dict=medpc_name_to_info_dict,
+                    medpc_name_to_info_dict=fallback_medpc_name_to_info_dict,
                     session_conditions=session_conditions,
                     start_variable=start_variable,
                 )
@@ -246,33 +441,64 @@ def get_session_key_from_kwargs(session_to_nwb_kwargs: dict):
     """
     behavior_file_path = session_to_nwb_kwargs["behavior_file_path"]
     session_conditions = session_to_nwb_kwargs["session_conditions"]
-    session_key = f"behavior_file_path={behavior_file_path}"
-    for key, value in session_conditions.items():
-        session_key += f"_{key}={value}"
-    return session_key
+    session_key_parts = [f"behavior_file_path={os.fspath(behavior_file_path)}"]
+    session_key_parts.extend(f"{key}={value}" for key, value in session_conditions.items())
+    return "_".join(session_key_parts)
 
 
-def safe_session_to_nwb(*, session_to_nwb_kwargs: dict, exception_file_path: Union[Path, str]):
-    """Convert a session to NWB while handling any errors by recording error messages to the exception_file_path.
+def safe_session_to_nwb(*, session_to_nwb_kwargs: dict, output_dir_path: Union[Path, str]):
+    """Convert a session to NWB while handling any errors by recording error messages to an ERROR_*.txt file.
 
     Parameters
     ----------
     session_to_nwb_kwargs : dict
         The arguments for session_to_nwb.
-    exception_file_path : Path
-        The path to the file where the exception messages will be saved.
+    output_dir_path : Path
+        The path to the directory where the exception messages will be saved.
     """
-    exception_file_path = Path(exception_file_path)
     try:
         session_to_nwb(**session_to_nwb_kwargs)
     except Exception as e:
+        # The file name is only built once a session actually fails
+        experiment_type = session_to_nwb_kwargs["experiment_type"]
+        experimental_group = session_to_nwb_kwargs["experimental_group"]
+        subject_id = session_to_nwb_kwargs["subject_id"]
+        if experiment_type == "Opto":
+            optogenetic_treatment = session_to_nwb_kwargs.get("optogenetic_treatment", None)
+            exception_file_name = (
+                f"ERROR_{experiment_type}_{experimental_group}_{optogenetic_treatment}_{subject_id}.txt"
+            )
+        else:
+            exception_file_name = f"ERROR_{experiment_type}_{experimental_group}_{subject_id}.txt"
+        exception_file_path = Path(output_dir_path) / exception_file_name
         with open(exception_file_path, mode="w") as f:
             f.write(f"session_to_nwb_kwargs: \n {pformat(session_to_nwb_kwargs)}\n\n")
             f.write(traceback.format_exc())
 
 
+def safe_sessions_to_nwb(*, session_to_nwb_args_per_session: list[dict], output_dir_path: Union[Path, str]):
+    """Convert a chunk of sessions to NWB with safe_session_to_nwb, one after the other.
+
+    Parameters
+    ----------
+    session_to_nwb_args_per_session : list[dict]
+        The arguments for session_to_nwb for each session in the chunk.
+    output_dir_path : Path
+        The path to the directory where the exception messages will be saved.
+    """
+    for session_to_nwb_kwargs in session_to_nwb_args_per_session:
+        safe_session_to_nwb(session_to_nwb_kwargs=session_to_nwb_kwargs, output_dir_path=output_dir_path)
+
+
 def fp_to_nwb(
-    *, data_dir_path: Path, output_dir_path: Path, start_variable: str, stub_test: bool = False, verbose: bool = True
+    *,
+    data_dir_path: Path,
+    output_dir_path: Path,
+    start_variable: str,
+    cache_dir_path: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+    stub_test: bool = False,
+    verbose: bool = True,
 ):
     """Convert the Fiber Photometry portion of the dataset to NWB.
 
@@ -284,6 +510,12 @@ def fp_to_nwb(
         The path to the directory where the NWB files will be saved.
     start_variable : str
         The variable to use as the start variable for the session.
+    cache_dir_path : Path, optional
+        The path to the directory where the raw MedPC file headers (raw_file_to_info.pkl) and the csv session matching
+        tables (fp_matching_cache.pkl) are cached between runs, by default None (nothing is cached).
+    max_workers : int, optional
+        The number of worker processes used to parse the MEDPC_RawFilesbyDate headers, by default None (one per CPU
+        core).
     stub_test : bool, optional
         Whether to run a stub test, by default False
     verbose : bool, optional
@@ -296,6 +528,15 @@ def fp_to_nwb(
     """
     # Setup
     experiment_type = "FP"
+    # The session_to_nwb arguments shared by every session
+    base_session_to_nwb_args = dict(
+        data_dir_path=data_dir_path,
+        output_dir_path=output_dir_path,
+        start_variable=start_variable,
+        experiment_type=experiment_type,
+        stub_test=stub_test,
+        verbose=verbose,
+    )
     experimental_groups = ["DPR", "PR", "PS", "RR20"]
     experimental_group_to_long_name = {
         "DPR": "Delayed Punishment Resistant",
@@ -305,63 +546,6 @@ def fp_to_nwb(
     }
     behavior_path = data_dir_path / f"{experiment_type} Experiments" / "Behavior"
     photometry_path = data_dir_path / f"{experiment_type} Experiments" / "Photometry"
-    fi1r_only_sessions = {
-        "Photo_333_393-200713-121027",
-        "Photo_346_394-200707-141513",
-        "Photo_64_205-181017-094913",
-        "Photo_81_236-190117-102128",
-        "Photo_87_239-190228-111317",
-        "Photo_81_236-190207-101451",
-        "Photo_87_239-190321-110120",
-        "Photo_88_239-190311-112034",
-        "Photo_333_393-200729-115506",
-        "Photo_346_394-200722-132345",
-        "Photo_349_393-200717-123319",
-        "Photo_111_285-190605-142759",
-        "Photo_141_308-190809-143410",
-        "Photo_80_236-190121-093425",
-        "Photo_61_207-181017-105639",
-        "Photo_63_207-181015-093910",
-        "Photo_63_207-181030-103332",
-        "Photo_80_236-190121-093425",
-        "Photo_89_247-190328-125515",
-        "Photo_028_392-200724-130323",
-        "Photo_048_392-200728-121222",
-        "Photo_112_283-190620-093542",
-        "Photo_113_283-190605-115438",
-        "Photo_114_273-190607-140822",
-        "Photo_115_273-190611-115654",
-        "Photo_139_298-190809-132427",
-        "Photo_75_214-181029-124815",
-        "Photo_92_246-190227-143210",
-        "Photo_92_246-190227-150307",
-        "Photo_93_246-190222-130128",
-        "Photo_75_214-181029-124815",
-        "Photo_78_214-181031-131820",
-        "Photo_90_247-190328-103249",
-        "Photo_92_246-190228-132737",
-        "Photo_92_246-190319-114357",
-        "Photo_93_246-190222-130128",
-        "Photo_94_246-190328-113641",
-        "Photo_140_306-190903-102551",
-        "Photo_271_396-200722-121638",
-        "Photo_347_393-200723-113530",
-        "Photo_348_393-200730-113125",
-        "Photo_139_298-190912-095034",
-        "Photo_88_239-190219-140027",
-        "Photo_89_247-190308-095258",
-        "Photo_140_306-190809-121107",
-        "Photo_271_396-200707-125117",
-        "Photo_96_259-190417-160333",
-        "Photo_97_257-190417-134643",
-        "Photo_97_257-190506-120133",
-        "Photo_98_257-190424-114024",
-        "Photo_98_257-190510-095056",
-        "Photo_99_257-190506-130951",
-        "Photo_100_258-190423-122632",
-        "Photo_100_258-190509-133212",
-        "Photo_101_260-190425-120029",
-    }
     partial_subject_ids_to_subject_id = {
         "300": "300.405",
         "418": "418.404",
@@ -369,131 +553,87 @@ def fp_to_nwb(
         "276": "276.405",
         "262.259.478": "262.478",
     }
-    raw_file_to_info = get_raw_info(behavior_path)
+    raw_info_cache_file_path, fp_matching_cache_file_path = None, None
+    if cache_dir_path is not None:
+        cache_dir_path.mkdir(parents=True, exist_ok=True)
+        raw_info_cache_file_path = cache_dir_path / "raw_file_to_info.pkl"
+        fp_matching_cache_file_path = cache_dir_path / "fp_matching_cache.pkl"
+    raw_file_to_info = get_raw_info(behavior_path, cache_file_path=raw_info_cache_file_path, max_workers=max_workers)
+    subject_to_raw_sessions, date_to_raw_sessions = get_raw_session_indices(raw_file_to_info)
+    if fp_matching_cache_file_path is not None:
+        load_fp_matching_cache(fp_matching_cache_file_path)
+
+    # Gather every subject's sessions in parallel up front, so the loops below only look them up
+    all_subject_dirs = []
+    for experimental_group in experimental_groups:
+        with os.scandir(behavior_path / experimental_group) as entries:
+            all_subject_dirs.extend(Path(entry.path) for entry in entries if entry.is_dir())
+    subject_dir_to_session_rows = get_session_rows_per_subject_dir(
+        subject_dirs=all_subject_dirs,
+        subject_to_raw_sessions=subject_to_raw_sessions,
+        date_to_raw_sessions=date_to_raw_sessions,
+        start_variable=start_variable,
+        max_workers=max_workers,
+    )
 
     # Iterate through file system to get necessary information for converting each session
     session_to_nwb_args_per_session: list[dict] = []  # Each dict contains the args for session_to_nwb for a session
     unique_session_keys = set()  # Each entry is a unique string key for a session
+    subject_dir_to_date_to_session_rows = {}  # Each subject's sessions, grouped by start date
 
     # Iterate through all photometry files
     for experimental_group, long_name in experimental_group_to_long_name.items():
         experimental_group_path = photometry_path / long_name
-        experimental_subgroups = [subgroup for subgroup in experimental_group_path.iterdir() if subgroup.is_dir()]
+        with os.scandir(experimental_group_path) as entries:
+            experimental_subgroups = [Path(entry.path) for entry in entries if entry.is_dir()]
         for experimental_subgroup in experimental_subgroups:  # Early or Late but with typos ex. 'late' vs 'Late'
+            # scandir reuses the file type from the directory listing, so is_dir() needs no extra stat call
             fiber_photometry_folder_paths = []
-            for fiber_photometry_folder_path in experimental_subgroup.iterdir():
-                if fiber_photometry_folder_path.name.startswith("Photo"):
-                    fiber_photometry_folder_paths.append(fiber_photometry_folder_path)
-                elif fiber_photometry_folder_path.is_dir():
-                    for fiber_photometry_folder_path_sub in fiber_photometry_folder_path.iterdir():
-                        if fiber_photometry_folder_path_sub.name.startswith("Photo"):
-                            fiber_photometry_folder_paths.append(fiber_photometry_folder_path_sub)
+            with os.scandir(experimental_subgroup) as entries:
+                for entry in entries:
+                    if entry.name.startswith("Photo"):
+                        fiber_photometry_folder_paths.append(Path(entry.path))
+                    elif entry.is_dir():
+                        with os.scandir(entry.path) as sub_entries:
+                            fiber_photometry_folder_paths.extend(
+                                Path(sub_entry.path) for sub_entry in sub_entries if sub_entry.name.startswith("Photo")
+                            )
             for fiber_photometry_folder_path in fiber_photometry_folder_paths:
-                photometry_subject_id = (
-                    fiber_photometry_folder_path.name.split("-")[0].split("Photo_")[1].replace("_", ".")
-                )
-                photometry_start_date = fiber_photometry_folder_path.name.split("-")[1]
-                photometry_start_date = datetime.strptime(photometry_start_date, "%y%m%d").strftime("%m/%d/%y")
+                folder_name_parts = fiber_photometry_folder_path.name.split("-")  # Photo_<subject>-<YYMMDD>-<HHMMSS>
+                photometry_subject_id = folder_name_parts[0].split("Photo_")[1].replace("_", ".")
+                yymmdd = folder_name_parts[1]
+                photometry_start_date = f"{yymmdd[2:4]}/{yymmdd[4:6]}/{yymmdd[:2]}"  # MM/DD/YY to match the MedPC dates
 
                 subject_dir = behavior_path / experimental_group / photometry_subject_id
-                header_variables = get_fp_header_variables(
-                    subject_dir, photometry_subject_id, raw_file_to_info, start_variable
+                if subject_dir not in subject_dir_to_date_to_session_rows:
+                    session_rows = subject_dir_to_session_rows.get(subject_dir)
+                    if session_rows is None:
+                        session_rows = get_fp_header_variables(
+                            subject_dir,
+                            photometry_subject_id,
+                            subject_to_raw_sessions,
+                            date_to_raw_sessions,
+                            start_variable,
+                        )
+                    date_to_session_rows = defaultdict(list)
+                    for session_row in session_rows:
+                        date_to_session_rows[session_row.start_date].append(session_row)
+                    subject_dir_to_date_to_session_rows[subject_dir] = date_to_session_rows
+                matching_session_rows = [
+                    session_row
+                    for session_row in subject_dir_to_date_to_session_rows[subject_dir].get(photometry_start_date, [])
+                    if (photometry_subject_id, photometry_start_date, session_row.msn) not in WRONG_MSN_FP_SESSIONS
+                ]
+                skip_keys = (
+                    (photometry_subject_id, photometry_start_date, None),
+                    (photometry_subject_id, photometry_start_date, experimental_subgroup.name),
                 )
-                start_dates, start_times, msns, file_paths, subjects, box_numbers = header_variables
-                matching_start_dates = []
-                matching_start_times = []
-                matching_msns = []
-                matching_file_paths = []
-                matching_subjects = []
-                matching_box_numbers = []
-                for start_date, start_time, msn, file, subject, box_number in zip(
-                    start_dates, start_times, msns, file_paths, subjects, box_numbers
-                ):
-                    if (
-                        photometry_subject_id == "271.396"
-                        and photometry_start_date == "07/07/20"
-                        and msn
-                        == "FOOD_RI 60 RIGHT TTL"  # This session was accidentally run on the wrong MSN and should be skipped
-                        or photometry_subject_id == "88.239"
-                        and photometry_start_date == "02/19/19"
-                        and msn
-                        == "FOOD_RI 60 LEFT TTL"  # This session was accidentally run on the wrong MSN and should be skipped
-                    ):
-                        continue
-                    if start_date == photometry_start_date:
-                        matching_start_dates.append(start_date)
-                        matching_start_times.append(start_time)
-                        matching_msns.append(msn)
-                        matching_file_paths.append(file)
-                        matching_subjects.append(subject)
-                        matching_box_numbers.append(box_number)
-                if (
-                    (
-                        photometry_subject_id == "334.394" and photometry_start_date == "07/21/20"
-                    )  # Skipping this session bc photometry data is corrupted
-                    or (
-                        photometry_subject_id == "99.257"
-                        and photometry_start_date == "04/16/19"
-                        # Skipping this session bc missing behavior data
-                    )
-                    or (
-                        photometry_subject_id == "64.205"
-                        and photometry_start_date == "10/17/18"
-                        and experimental_subgroup.name == "Late"
-                    )  # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_64_205-181017-094913
-                    or (
-                        photometry_subject_id == "81.236"
-                        and photometry_start_date == "01/17/19"
-                        and experimental_subgroup.name == "Late"
-                    )  # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_81_236-190117-102128
-                    or (
-                        photometry_subject_id == "87.239"
-                        and photometry_start_date == "02/28/19"
-                        and experimental_subgroup.name == "Late"
-                    )  # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_87_239-190228-111317
-                    or (
-                        photometry_subject_id == "88.239"
-                        and photometry_start_date == "02/19/19"
-                        and experimental_subgroup.name == "Late"
-                    )  # This session is a duplicate of Delayed Punishment Resistant/Early/Photo_88_239-190219-140027
-                    or (
-                        photometry_subject_id == "80.236"
-                        and photometry_start_date == "01/21/19"
-                        and experimental_subgroup.name == "Late RI60"
-                    )  # This session is a duplicate of Delayed Punishment Resistant/Early RI 60/Photo_80_236-190121-093425
-                    or (
-                        photometry_subject_id == "75.214"
-                        and photometry_start_date == "10/29/18"
-                        and experimental_subgroup.name == "Late RI60"
-                    )  # This session is a duplicate of Punishment Sensitive/Early RI60/Photo_75_214-181029-124815
-                    or (
-                        photometry_subject_id == "93.246"
-                        and photometry_start_date == "02/22/19"
-                        and experimental_subgroup.name == "Late RI60"
-                    )  # This session is a duplicate of Punishment Sensitive/Early RI60/Photo_93_246-190222-130128
-                    or (
-                        photometry_subject_id == "78.214"
-                        and photometry_start_date == "10/31/18"
-                        and experimental_subgroup.name == "Late RI60"
-                    )  # This session is a duplicate of Punishment Sensitive/Early RI60/Photo_78_214-181031-131820
-                    or (
-                        photometry_subject_id == "96.259"
-                        and photometry_start_date == "05/06/19"
-                        and experimental_subgroup.name == "late"
-                    )  # This session is missing RNnR TTLs
-                ):
+                if not FP_SESSIONS_TO_SKIP.isdisjoint(skip_keys):
                     continue
                 assert (
-                    len(matching_start_dates) == 1
-                ), f"Expected 1 matching session for {experimental_group}/{photometry_subject_id} on {photometry_start_date}, but found {len(matching_start_dates)}"
-                start_date, start_time, msn, file, subject, box_number = (
-                    matching_start_dates[0],
-                    matching_start_times[0],
-                    matching_msns[0],
-                    matching_file_paths[0],
-                    matching_subjects[0],
-                    matching_box_numbers[0],
-                )
+                    len(matching_session_rows) == 1
+                ), f"Expected 1 matching session for {experimental_group}/{photometry_subject_id} on {photometry_start_date}, but found {len(matching_session_rows)}"
+                start_date, start_time, msn, file, subject, box_number = matching_session_rows[0]
                 session_conditions = {
                     "Start Date": start_date,
                     "Start Time": start_time,
@@ -505,39 +645,26 @@ def fp_to_nwb(
                 if photometry_subject_id in partial_subject_ids_to_subject_id:
                     photometry_subject_id = partial_subject_ids_to_subject_id[photometry_subject_id]
                 session_to_nwb_args = dict(
-                    data_dir_path=data_dir_path,
-                    output_dir_path=output_dir_path,
+                    base_session_to_nwb_args,
                     behavior_file_path=file,
                     fiber_photometry_folder_path=fiber_photometry_folder_path,
                     subject_id=photometry_subject_id,
                     session_conditions=session_conditions,
-                    start_variable=start_variable,
-                    experiment_type=experiment_type,
                     experimental_group=experimental_group,
-                    stub_test=stub_test,
-                    verbose=verbose,
                 )
-                if fiber_photometry_folder_path.name in fi1r_only_sessions:
+                if fiber_photometry_folder_path.name in FI1R_ONLY_SESSIONS:
                     session_to_nwb_args["has_demodulated_commanded_voltages"] = False
-                if fiber_photometry_folder_path.name == "Photo_139_298-190912-095034":
-                    session_to_nwb_args["fiber_photometry_t2"] = 2267.0
-                    session_to_nwb_args["second_fiber_photometry_folder_path"] = (
-                        fiber_photometry_folder_path.parent / "Photo_139_298-190912-103544"
-                    )
-                if fiber_photometry_folder_path.name == "Photo_139_298-190912-103544":
-                    continue  # This is the second_fiber_photometry_folder_path of Photo_139_298-190912-095034
-                if fiber_photometry_folder_path.name == "Photo_332_393-200728-122403":
+                if fiber_photometry_folder_path.name in FIRST_TO_SECOND_FIBER_PHOTOMETRY_FOLDER_NAME:
+                    second_folder_name = FIRST_TO_SECOND_FIBER_PHOTOMETRY_FOLDER_NAME[fiber_photometry_folder_path.name]
                     session_to_nwb_args["second_fiber_photometry_folder_path"] = (
-                        fiber_photometry_folder_path.parent / "Photo_332_393-200728-123314"
+                        fiber_photometry_folder_path.parent / second_folder_name
                     )
-                if fiber_photometry_folder_path.name == "Photo_332_393-200728-123314":
-                    continue  # This is the second_fiber_photometry_folder_path of Photo_332_393-200728-122403
-                if fiber_photometry_folder_path.name == "Photo_92_246-190227-143210":
-                    session_to_nwb_args["second_fiber_photometry_folder_path"] = (
-                        fiber_photometry_folder_path.parent / "Photo_92_246-190227-150307"
-                    )
-                if fiber_photometry_folder_path.name == "Photo_92_246-190227-150307":
-                    continue  # This is the second_fiber_photometry_folder_path of Photo_92_246-190227-143210
+                if fiber_photometry_folder_path.name in FIBER_PHOTOMETRY_FOLDER_NAME_TO_T2:
+                    session_to_nwb_args["fiber_photometry_t2"] = FIBER_PHOTOMETRY_FOLDER_NAME_TO_T2[
+                        fiber_photometry_folder_path.name
+                    ]
+                if fiber_photometry_folder_path.name in SECOND_FIBER_PHOTOMETRY_FOLDER_NAMES:
+                    continue  # This is the second_fiber_photometry_folder_path of another session
                 if photometry_subject_id == "140.306" and photometry_start_date == "08/09/19":
                     session_to_nwb_args["flip_ttls_lr"] = True
 
@@ -550,14 +677,12 @@ def fp_to_nwb(
     # Iterate through all behavior files
     for experimental_group in experimental_groups:
         experimental_group_path = behavior_path / experimental_group
-        subject_dirs = [subject_dir for subject_dir in experimental_group_path.iterdir() if subject_dir.is_dir()]
+        with os.scandir(experimental_group_path) as entries:
+            subject_dirs = [Path(entry.path) for entry in entries if entry.is_dir()]
         for subject_dir in subject_dirs:
             subject_id = subject_dir.name
-            header_variables = get_fp_header_variables(subject_dir, subject_id, raw_file_to_info, start_variable)
-            start_dates, start_times, msns, file_paths, subjects, box_numbers = header_variables
-            for start_date, start_time, msn, file, subject, box_number in zip(
-                start_dates, start_times, msns, file_paths, subjects, box_numbers
-            ):
+            session_rows = subject_dir_to_session_rows[subject_dir]
+            for start_date, start_time, msn, file, subject, box_number in session_rows:
                 if session_should_be_skipped(
                     start_date=start_date,
                     start_time=start_time,
@@ -576,22 +701,19 @@ def fp_to_nwb(
                 if subject_id in partial_subject_ids_to_subject_id:
                     subject_id = partial_subject_ids_to_subject_id[subject_id]
                 session_to_nwb_args = dict(
-                    data_dir_path=data_dir_path,
-                    output_dir_path=output_dir_path,
+                    base_session_to_nwb_args,
                     behavior_file_path=file,
                     subject_id=subject_id,
                     session_conditions=session_conditions,
-                    start_variable=start_variable,
-                    experiment_type=experiment_type,
                     experimental_group=experimental_group,
-                    stub_test=stub_test,
-                    verbose=verbose,
                 )
                 session_key = get_session_key_from_kwargs(session_to_nwb_args)
                 if session_key in unique_session_keys:
                     continue
                 unique_session_keys.add(session_key)
                 session_to_nwb_args_per_session.append(session_to_nwb_args)
+    if fp_matching_cache_file_path is not None:
+        save_fp_matching_cache(fp_matching_cache_file_path)
     return session_to_nwb_args_per_session
 
 
@@ -649,6 +771,15 @@ def opto_to_nwb(
         "262.259.478": "262.478",
     }
     experiment_type = "Opto"
+    # The session_to_nwb arguments shared by every session
+    base_session_to_nwb_args = dict(
+        data_dir_path=data_dir_path,
+        output_dir_path=output_dir_path,
+        start_variable=start_variable,
+        experiment_type=experiment_type,
+        stub_test=stub_test,
+        verbose=verbose,
+    )
     experimental_group_to_optogenetic_treatments = {
         "DLS-Excitatory": ["ChR2", "EYFP", "ChR2Scrambled"],
         "DMS-Excitatory": ["ChR2", "EYFP", "ChR2Scrambled"],
@@ -682,22 +813,21 @@ def opto_to_nwb(
                 else:
                     optogenetic_treatment_folder_name = optogenetic_treatment_to_folder_name[optogenetic_treatment]
                 optogenetic_treatment_path = subgroup_path / optogenetic_treatment_folder_name
-                subject_paths = [
-                    path
-                    for path in optogenetic_treatment_path.iterdir()
-                    if not (
-                        path.name.startswith(".")
-                        or path.name.endswith(".csv")
-                        or path.name.endswith(".CSV")  # session-aggregated CSV files are skipped
-                    )
-                ]
-                for subject_path in subject_paths:
+                with os.scandir(optogenetic_treatment_path) as entries:
+                    subject_entries = [
+                        entry
+                        for entry in entries
+                        if not (
+                            entry.name.startswith(".")
+                            or entry.name.endswith(".csv")
+                            or entry.name.endswith(".CSV")  # session-aggregated CSV files are skipped
+                        )
+                    ]
+                for subject_entry in subject_entries:
+                    subject_path = Path(subject_entry.path)
                     subject_id = get_opto_subject_id(subject_path)
-                    header_variables = get_opto_header_variables(subject_path)
-                    start_dates, start_times, msns, file_paths, subjects, box_numbers = header_variables
-                    for start_date, start_time, msn, file, subject, box_number in zip(
-                        start_dates, start_times, msns, file_paths, subjects, box_numbers
-                    ):
+                    session_rows = get_opto_header_variables(subject_path, is_dir=subject_entry.is_dir())
+                    for start_date, start_time, msn, file, subject, box_number in session_rows:
                         if session_should_be_skipped(
                             start_date=start_date,
                             start_time=start_time,
@@ -714,17 +844,12 @@ def opto_to_nwb(
                         if box_number is not None:
                             session_conditions["Box"] = box_number
                         session_to_nwb_args = dict(
-                            data_dir_path=data_dir_path,
-                            output_dir_path=output_dir_path,
+                            base_session_to_nwb_args,
                             behavior_file_path=file,
                             subject_id=subject_id,
                             session_conditions=session_conditions,
-                            start_variable=start_variable,
-                            experiment_type=experiment_type,
                             experimental_group=experimental_group,
                             optogenetic_treatment=optogenetic_treatment,
-                            stub_test=stub_test,
-                            verbose=verbose,
                         )
                         session_key = get_session_key_from_kwargs(session_to_nwb_args)
                         if session_key in unique_session_keys:
@@ -733,23 +858,26 @@ def opto_to_nwb(
                         session_to_nwb_args_per_session.append(session_to_nwb_args)
     # DLS Excitatory raw files by date
     raw_files_by_date_path = data_dir_path / "Opto Experiments" / "DLS Excitatory"
-    start_dates, start_times, msns, file_paths, subjects, box_numbers = [], [], [], [], [], []
-    for file in raw_files_by_date_path.iterdir():
-        if (
-            file.name.startswith(".") or file.is_dir() or file.suffix == ".csv"
-        ):  # These .csv files are skipped bc they don't have subject info
-            continue
-        info = get_medpc_variables(file_path=file, variable_names=["Subject", "Start Date", "Start Time", "MSN", "Box"])
-        for i in range(len(info["Subject"])):
-            start_dates.append(info["Start Date"][i])
-            start_times.append(info["Start Time"][i])
-            msns.append(info["MSN"][i])
-            file_paths.append(file)
-            subjects.append(info["Subject"][i])
-            box_numbers.append(info["Box"][i])
-    for start_date, start_time, msn, file, subject, box_number in zip(
-        start_dates, start_times, msns, file_paths, subjects, box_numbers
-    ):
+    session_rows = []
+    with os.scandir(raw_files_by_date_path) as entries:
+        # Cheap name checks first, so rejected entries never pay for a stat or a Path allocation
+        # These .csv files are skipped bc they don't have subject info
+        raw_files = [
+            Path(entry.path)
+            for entry in entries
+            if not (entry.name.startswith(".") or entry.name.endswith(".csv") or entry.is_dir())
+        ]
+    for file in raw_files:
+        info = get_cached_medpc_variables(
+            file_path=file, variable_names=("Subject", "Start Date", "Start Time", "MSN", "Box")
+        )
+        session_rows.extend(
+            SessionRow(start_date, start_time, msn, file, subject, box_number)
+            for subject, start_date, start_time, msn, box_number in zip(
+                info["Subject"], info["Start Date"], info["Start Time"], info["MSN"], info["Box"]
+            )
+        )
+    for start_date, start_time, msn, file, subject, box_number in session_rows:
         if session_should_be_skipped(
             start_date=start_date,
             start_time=start_time,
@@ -766,17 +894,12 @@ def opto_to_nwb(
         if subject in partial_subject_ids_to_subject_id:
             subject = partial_subject_ids_to_subject_id[subject]
         session_to_nwb_args = dict(
-            data_dir_path=data_dir_path,
-            output_dir_path=output_dir_path,
+            base_session_to_nwb_args,
             behavior_file_path=file,
             subject_id=subject,
             session_conditions=session_conditions,
-            start_variable=start_variable,
-            experiment_type=experiment_type,
             experimental_group="DLS-Excitatory",
             optogenetic_treatment="Unknown",
-            stub_test=stub_test,
-            verbose=verbose,
         )
         session_key = get_session_key_from_kwargs(session_to_nwb_args)
         if session_key in unique_session_keys:
@@ -899,61 +1022,60 @@ def get_opto_subject_id(subject_path: Path):
     return subject_id
 
 
-def get_opto_header_variables(subject_path):
+def get_opto_header_variables(subject_path: Path, is_dir: bool):
     """Get the header variables for the Optogenetic portion of the dataset.
 
     Parameters
     ----------
     subject_path : Path
-        The path to the subject directory.
+        The path to the subject medpc file or directory.
+    is_dir : bool
+        Whether the subject_path is a directory (as opposed to a single medpc file).
+        Passed in by the caller, which already knows this from its os.scandir entry, to avoid extra stat() calls.
 
     Returns
     -------
-    tuple
-        A tuple containing the start dates, start times, MSNs, file paths, subjects, and box numbers.
+    list[SessionRow]
+        A list of session rows containing the start date, start time, MSN, file path, subject, and box number.
     """
-    if subject_path.is_file():
+    session_rows = []
+    if not is_dir:
         medpc_file_path = subject_path
-        medpc_variables = get_medpc_variables(
-            file_path=medpc_file_path, variable_names=["Start Date", "Start Time", "MSN"]
+        medpc_variables = get_cached_medpc_variables(
+            file_path=medpc_file_path, variable_names=("Start Date", "Start Time", "MSN")
         )
-        start_dates = medpc_variables["Start Date"]
-        start_times = medpc_variables["Start Time"]
-        msns = medpc_variables["MSN"]
-        file_paths = [medpc_file_path] * len(start_dates)
-        subjects = [None] * len(start_dates)
-        box_numbers = [None] * len(start_dates)
-    elif subject_path.is_dir():
-        start_dates, start_times, msns, file_paths = [], [], [], []
+        session_rows.extend(
+            SessionRow(start_date, start_time, msn, medpc_file_path, None, None)
+            for start_date, start_time, msn in zip(
+                medpc_variables["Start Date"], medpc_variables["Start Time"], medpc_variables["MSN"]
+            )
+        )
+    else:
         medpc_files, csv_files = [], []
         for file in subject_path.iterdir():
             if file.name.startswith("."):
                 continue
-            if file.suffix == ".csv" or file.suffix == ".CSV":
+            if file.suffix.lower() == ".csv":
                 csv_files.append(file)
-            elif not file.name.startswith("."):
+            else:
                 medpc_files.append(file)
         for file in medpc_files:
-            medpc_variables = get_medpc_variables(file_path=file, variable_names=["Start Date", "Start Time", "MSN"])
-            for start_date, start_time, msn in zip(
-                medpc_variables["Start Date"], medpc_variables["Start Time"], medpc_variables["MSN"]
-            ):
-                start_dates.append(start_date)
-                start_times.append(start_time)
-                msns.append(msn)
-                file_paths.append(file)
+            medpc_variables = get_cached_medpc_variables(
+                file_path=file, variable_names=("Start Date", "Start Time", "MSN")
+            )
+            session_rows.extend(
+                SessionRow(start_date, start_time, msn, file, None, None)
+                for start_date, start_time, msn in zip(
+                    medpc_variables["Start Date"], medpc_variables["Start Time"], medpc_variables["MSN"]
+                )
+            )
         for file in csv_files:
             start_date = file.stem.split("_")[1].replace("-", "/")
             start_time = "00:00:00"
             msn = "Unknown"
-            start_dates.append(start_date)
-            start_times.append(start_time)
-            msns.append(msn)
-            file_paths.append(file)
-        subjects = [None] * len(start_dates)
-        box_numbers = [None] * len(start_dates)
+            session_rows.append(SessionRow(start_date, start_time, msn, file, None, None))
 
-    return start_dates, start_times, msns, file_paths, subjects, box_numbers
+    return session_rows
 
 
 def session_should_be_skipped(*, start_date, start_time, subject_id, msn):
@@ -978,129 +1100,13 @@ def session_should_be_skipped(*, start_date, start_time, subject_id, msn):
     bool
         True if the session should be skipped, False otherwise.
     """
-    msns_to_skip = {
-        "RR10_Right_AHJS",
-        "Magazine Training 1 hr",
-        "FOOD_Magazine Training 1 hr",
-        "RI_60_Left_Probability_AH_050619",
-        "RI_60_Right_Probability_AH_050619",
-        "Extinction - 1 HR",
-        "RR10_Left_AHJS",
-        "Probe Test Habit Training CC",
-        "FOOD_FR1 Hapit Training TTL",
-        "RK_C_FR1_BOTH_1hr",
-        "Footshock_Right_Stim",
-        "Footshock_Left_Stim",
-        "ICSS_Right",
-        "RI_60_Right_Probability_AH_FINAL",
-        "RI_60_Left_Probability_AH_FINAL",
-        "PelletStimD_Right",
-        "PelletStimD_Left",
-        "PelletStimBoth",
-    }
     if subject_id == "":
         return True
-    if msn in msns_to_skip:
+    if msn in MSNS_TO_SKIP:
         return True
-    if (
-        (
-            start_date == "09/20/19"
-            and start_time == "09:42:54"
-            and subject_id == "139.298"
-            and msn == "RI 60 RIGHT STIM"
-        )  # This session is actually from subject 144.306, which should be skipped
-        or (
-            start_date == "07/28/20"
-            and start_time == "13:21:15"
-            and subject_id == "272.396"
-            and msn == "Probe Test Habit Training TTL"
-        )  # This session is actually from subject 334, which should be skipped
-        or (
-            start_date == "07/31/20"
-            and start_time == "12:03:31"
-            and subject_id == "346.394"
-            and msn == "FOOD_RI 60 RIGHT TTL"
-        )  # This session is actually from subject 333, which should be skipped
-        or (
-            start_date == "06/16/20"
-            and start_time == "11:59:32"
-            and subject_id == "028.392"
-            and msn == "FOOD_FR1 HT TTL (Both)"
-        )  # This session is only 2 mins long and has no behavioral data (likely an error)
-        or (
-            start_date == "02/25/19" and start_time == "11:08:22" and subject_id == "87.239"
-        )  # This session is <1min long and has no behavioral data (likely an error)
-        or (
-            start_date == "03/12/19" and start_time == "14:27:00" and subject_id == "88.239"
-        )  # This session is 13min long and has no behavioral data (likely an error)
-        or (
-            start_date == "03/14/19" and start_time == "10:52:10" and subject_id == "88.239"
-        )  # This session is <1min long and has no behavioral data (likely an error)
-        or (
-            start_date == "02/08/19" and start_time == "12:49:58" and subject_id == "80.236"
-        )  # This session is <1min long and has no behavioral data (likely an error)
-        or (
-            start_date == "03/15/19" and start_time == "10:20:33" and subject_id == "89.247"
-        )  # This session is <1min long and has no behavioral data (likely an error)
-        or (
-            start_date == "06/25/19" and start_time == "11:06:21" and subject_id == "111.285"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "02/17/19" and start_time == "14:35:42" and subject_id == "90.247"
-        )  # This session is <1min long and has no behavioral data (likely an error)
-        or (
-            start_date == "03/20/19" and start_time == "14:02:22" and subject_id == "92.246"
-        )  # This session is <5min long and has no behavioral data (likely an error)
-        or (
-            start_date == "03/01/19" and start_time == "15:15:07" and subject_id == "92.246"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "03/15/19" and start_time == "13:43:48" and subject_id == "93.246"
-        )  # This session is <1min long and has no behavioral data (likely an error)
-        or (
-            start_date == "02/26/19" and start_time == "16:48:27" and subject_id == "93.246"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "06/10/19" and start_time == "12:26:59" and subject_id == "110.271"
-        )  # This session is <2min long and has no behavioral data (likely an error)
-        or (
-            start_date == "06/25/19" and start_time == "12:58:56" and subject_id == "112.283"
-        )  # This session is <8min long and has no behavioral data (likely an error)
-        or (start_date == "06/05/19" and start_time == "10:32:25" and subject_id == "112.283")
-        or (
-            start_date == "05/31/19" and start_time == "10:21:31" and subject_id == "112.283"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "07/26/19" and start_time == "12:20:57" and subject_id == "113.283"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "06/28/19" and start_time == "08:51:30" and subject_id == "115.273"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "06/12/19" and start_time == "11:56:29" and subject_id == "115.273"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "09/13/19" and start_time == "10:01:57" and subject_id == "139.298"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "08/10/19" and start_time == "13:57:04" and subject_id == "139.298"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "05/14/19" and start_time == "11:35:01" and subject_id == "98.257"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "07/13/20" and start_time == "12:10:51" and subject_id == "239.388"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "07/26/19" and start_time == "11:32:18" and subject_id == "117.279"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "07/10/19" and start_time == "14:42:46" and subject_id == "117.279"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-        or (
-            start_date == "05/21/19" and start_time == "12:55:19" and subject_id == "479"
-        )  # This session is <10min long and has no behavioral data (likely an error)
-    ):
+    if (start_date, start_time, subject_id, msn) in SESSIONS_TO_SKIP:
+        return True
+    if (start_date, start_time, subject_id) in SESSION_STARTS_TO_SKIP:
         return True
     return False
 
@@ -1108,6 +1114,9 @@ def session_should_be_skipped(*, start_date, start_time, subject_id, msn):
 def get_csv_session_dates(subject_dir: Path):
     """Get the session dates from the CSV files in the subject directory.
 
+    The dates are stored in SUBJECT_DIR_TO_CSV_SESSION_DATES, keyed by the modification time of the subject directory
+    (which changes whenever a file is added, removed, or renamed), so the directory is only listed again when needed.
+
     Parameters
     ----------
     subject_dir : Path
@@ -1118,15 +1127,22 @@ def get_csv_session_dates(subject_dir: Path):
     list[str]
         A list of session dates in the format 'MM/DD/YY'.
     """
+    subject_dir_key = (str(subject_dir), subject_dir.stat().st_mtime_ns)
+    if subject_dir_key in SUBJECT_DIR_TO_CSV_SESSION_DATES:
+        return SUBJECT_DIR_TO_CSV_SESSION_DATES[subject_dir_key]
+
     csv_session_dates = []
-    for file in subject_dir.iterdir():
-        if file.suffix == ".csv" and not file.name.startswith(".") and not "dataForEachAnimal" in file.name:
-            date = file.stem.split("_")[1].replace("-", "/")
-            csv_session_dates.append(date)
+    with os.scandir(subject_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(".csv") and not name.startswith(".") and not "dataForEachAnimal" in name:
+                date = name[: -len(".csv")].split("_")[1].replace("-", "/")
+                csv_session_dates.append(date)
+    SUBJECT_DIR_TO_CSV_SESSION_DATES[subject_dir_key] = csv_session_dates
     return csv_session_dates
 
 
-def get_fp_header_variables(subject_dir, subject_id, raw_file_to_info, start_variable):
+def get_fp_header_variables(subject_dir, subject_id, subject_to_raw_sessions, date_to_raw_sessions, start_variable):
     """Get the header variables for the Fiber Photometry portion of the dataset.
 
     Parameters
@@ -1135,56 +1151,53 @@ def get_fp_header_variables(subject_dir, subject_id, raw_file_to_info, start_var
         The path to the subject directory.
     subject_id : str
         The subject ID.
-    raw_file_to_info : dict
-        A dictionary mapping raw files to their information.
+    subject_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping subjects to their sessions in the MEDPC_RawFilesbyDate (see get_raw_session_indices).
+    date_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping start dates to their sessions in the MEDPC_RawFilesbyDate (see get_raw_session_indices).
     start_variable : str
         The variable to use as the start variable for the session.
 
     Returns
     -------
-    tuple
-        A tuple containing the start dates, start times, MSNs, file paths, subjects, and box numbers.
+    list[SessionRow]
+        A list of session rows containing the start date, start time, MSN, file path, subject, and box number.
     """
     medpc_file_path = subject_dir / f"{subject_id}"
     if medpc_file_path.exists():  # Medpc file with all the sessions for the subject is located in the subject directory
-        medpc_variables = get_medpc_variables(
-            file_path=medpc_file_path, variable_names=["Start Date", "Start Time", "MSN"]
+        medpc_variables = get_cached_medpc_variables(
+            file_path=medpc_file_path, variable_names=("Start Date", "Start Time", "MSN")
         )
-        start_dates = medpc_variables["Start Date"]
-        start_times = medpc_variables["Start Time"]
-        msns = medpc_variables["MSN"]
-        file_paths = [medpc_file_path] * len(start_dates)
-        subjects = [None] * len(start_dates)
-        box_numbers = [None] * len(start_dates)
+        session_rows = [
+            SessionRow(start_date, start_time, msn, medpc_file_path, None, None)
+            for start_date, start_time, msn in zip(
+                medpc_variables["Start Date"], medpc_variables["Start Time"], medpc_variables["MSN"]
+            )
+        ]
     else:  # We need to grab all the subject's sessions from the Medpc files organized by date (rather than by subject)
-        start_dates, start_times, msns, file_paths, subjects = [], [], [], [], []
-        for file, info in raw_file_to_info.items():
-            for subject, start_date, start_time, msn in zip(
-                info["Subject"], info["Start Date"], info["Start Time"], info["MSN"]
-            ):
-                if subject == subject_id:
-                    start_dates.append(start_date)
-                    start_times.append(start_time)
-                    msns.append(msn)
-                    file_paths.append(file)
-                    subjects.append(subject_id)
-        box_numbers = [None] * len(start_dates)
+        session_rows = list(subject_to_raw_sessions.get(subject_id, ()))
 
     # Some subjects have sessions in the Medpc files organized by date without identifying subject info
     # We can identify these sessions by matching them to the CSV files in the subject directory
     csv_session_dates = get_csv_session_dates(subject_dir)
+    start_dates = {session_row.start_date for session_row in session_rows}
     for csv_date in csv_session_dates:
         if csv_date in start_dates:
             continue
         csv_file_path = subject_dir / f"{subject_id}_{csv_date.replace('/', '-')}.csv"
-        session_df = pd.read_csv(csv_file_path)
-        port_entry_times = np.trim_zeros(session_df["portEntryTs"].dropna().values, trim="b")
-        start_date, start_time, msn, file, subject, box_number = match_csv_session_to_medpc_session(
-            raw_file_to_info=raw_file_to_info,
-            csv_date=csv_date,
-            port_entry_times=port_entry_times,
-            start_variable=start_variable,
-        )
+        if not csv_file_path.exists():  # the csv file is not always read below, so catch mismatched names here
+            raise FileNotFoundError(f"No csv file named {csv_file_path.name} for {csv_date} in {subject_dir}")
+        start_date, start_time, msn, file, subject, box_number = None, None, None, None, None, None
+        if csv_date in date_to_raw_sessions:  # Only read the csv file if there are raw sessions it could match
+            session_df = pd.read_csv(csv_file_path, usecols=["portEntryTs"], dtype={"portEntryTs": np.float64})
+            port_entry_times = session_df["portEntryTs"].to_numpy()
+            port_entry_times = trim_trailing_zeros(port_entry_times[~np.isnan(port_entry_times)])
+            start_date, start_time, msn, file, subject, box_number = match_csv_session_to_medpc_session(
+                date_to_raw_sessions=date_to_raw_sessions,
+                csv_date=csv_date,
+                port_entry_times=port_entry_times,
+                start_variable=start_variable,
+            )
         if start_date is None:  # If we can't find a matching session in the Medpc files, we'll use the CSV file
             start_date = csv_date
             start_time = "00:00:00"
@@ -1192,26 +1205,25 @@ def get_fp_header_variables(subject_dir, subject_id, raw_file_to_info, start_var
             file = csv_file_path
             subject = subject_id
             box_number = None
+        session_rows.append(SessionRow(start_date, start_time, msn, file, subject, box_number))
+        start_dates.add(start_date)
 
-        start_dates.append(start_date)
-        start_times.append(start_time)
-        msns.append(msn)
-        file_paths.append(file)
-        subjects.append(subject)
-        box_numbers.append(box_number)
-
-    return start_dates, start_times, msns, file_paths, subjects, box_numbers
+    return session_rows
 
 
 def match_csv_session_to_medpc_session(
-    *, raw_file_to_info: dict[Path, dict], csv_date: str, port_entry_times: np.ndarray, start_variable: str
+    *,
+    date_to_raw_sessions: dict[str, tuple[SessionRow, ...]],
+    csv_date: str,
+    port_entry_times: np.ndarray,
+    start_variable: str,
 ):
     """Match a CSV session to a Medpc session using the port entry times.
 
     Parameters
     ----------
-    raw_file_to_info : dict[Path, dict]
-        A dictionary mapping raw file paths to their info dict, which contains the MedPC variables: Subject, Start Date, Start Time, MSN, and Box.
+    date_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping start dates to their sessions in the MEDPC_RawFilesbyDate (see get_raw_session_indices).
     csv_date : str
         The date of the CSV session in the format 'MM/DD/YY'.
     port_entry_times : np.ndarray
@@ -1225,37 +1237,318 @@ def match_csv_session_to_medpc_session(
         A tuple containing the start date, start time, MSN, file path, subject, and box number.
         If no match is found, returns None, None, None, None, None, None.
     """
-    subject = None
-    for file, info in raw_file_to_info.items():
-        for start_date, start_time, msn, box_number in zip(
-            info["Start Date"], info["Start Time"], info["MSN"], info["Box"]
-        ):
-            if start_date != csv_date:
-                continue
-            medpc_name_to_info_dict = {"G": {"name": "port_entry_times", "is_array": True}}
-            session_conditions = {
-                "Start Date": start_date,
-                "Start Time": start_time,
-                "Box": box_number,
-            }
-            session_dict = read_medpc_file(
-                file_path=file,
-                medpc_name_to_info_dict=medpc_name_to_info_dict,
-                session_conditions=session_conditions,
-                start_variable=start_variable,
-            )
-            if np.array_equal(port_entry_times, session_dict["port_entry_times"]):
-                return start_date, start_time, msn, file, subject, box_number
-    return None, None, None, None, None, None
+    port_entry_times_to_raw_session = get_port_entry_times_to_raw_session(
+        raw_sessions=date_to_raw_sessions.get(csv_date, ()), start_variable=start_variable
+    )
+    raw_session = port_entry_times_to_raw_session.get(np.asarray(port_entry_times, dtype=np.float64).tobytes())
+    if raw_session is None:
+        return None, None, None, None, None, None
+    return raw_session
+
+
+@lru_cache(maxsize=None)
+def get_port_entry_times_to_raw_session(
+    *, raw_sessions: tuple[SessionRow, ...], start_variable: str
+) -> dict[bytes, SessionRow]:
+    """Build a hash table from port entry times to the raw sessions on a single date.
+
+    Every csv session on a given date is matched against the same raw sessions, so the table is built once per date
+    and each subsequent match is a single dict lookup instead of a scan with element-wise comparisons.
+
+    Parameters
+    ----------
+    raw_sessions : tuple[SessionRow, ...]
+        The sessions in the MEDPC_RawFilesbyDate that share a start date.
+    start_variable : str
+        The variable to use as the start variable for the session.
+
+    Returns
+    -------
+    dict[bytes, SessionRow]
+        A dictionary mapping the raw bytes of the float64 port entry times to the first raw session with those times.
+    """
+    port_entry_times_to_raw_session = {}
+    for raw_session in raw_sessions:
+        medpc_port_entry_times = get_raw_session_port_entry_times(
+            file_path=raw_session.file_path,
+            start_date=raw_session.start_date,
+            start_time=raw_session.start_time,
+            box_number=raw_session.box_number,
+            start_variable=start_variable,
+        )
+        key = np.asarray(medpc_port_entry_times, dtype=np.float64).tobytes()
+        port_entry_times_to_raw_session.setdefault(key, raw_session)
+    return port_entry_times_to_raw_session
+
+
+@lru_cache(maxsize=None)
+def get_cached_medpc_variables(*, file_path: Path, variable_names: tuple[str, ...]) -> dict:
+    """Get the values of the given single-line variables from a MedPC file, parsing each file only once.
+
+    A subject's MedPC file is read for every one of its photometry folders as well as for its behavior sessions, so
+    the parsed headers are cached and shared between all of these lookups. The returned dict must not be modified.
 
+    Parameters
+    ----------
+    file_path : Path
+        The path to the MedPC file.
+    variable_names : tuple[str, ...]
+        The names of the variables to get the values of.
+
+    Returns
+    -------
+    dict
+        A dictionary with the variable names as keys and a list of variable values as values.
+    """
+    return get_medpc_variables(file_path=file_path, variable_names=list(variable_names))
 
-def get_raw_info(behavior_path: Path):
+
+def get_session_rows_per_subject_dir(
+    *,
+    subject_dirs: list[Path],
+    subject_to_raw_sessions: dict[str, tuple[SessionRow, ...]],
+    date_to_raw_sessions: dict[str, tuple[SessionRow, ...]],
+    start_variable: str,
+    max_workers: Optional[int] = None,
+) -> dict[Path, list[SessionRow]]:
+    """Run get_fp_header_variables for many subjects in parallel worker processes.
+
+    Reading the csv files and matching them to the raw sessions is CPU bound, so the subjects are spread across
+    processes. The raw session indices and the matching caches are sent once per worker (see init_fp_header_worker)
+    and the cache entries computed by the workers are merged back, so that save_fp_matching_cache persists them.
+
+    Parameters
+    ----------
+    subject_dirs : list[Path]
+        The paths to the subject directories in the Behavior folder.
+    subject_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping subject ids to their sessions in the MEDPC_RawFilesbyDate (see get_raw_session_indices).
+    date_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping start dates to their sessions in the MEDPC_RawFilesbyDate (see get_raw_session_indices).
+    start_variable : str
+        The variable to use as the start variable for the session.
+    max_workers : int, optional
+        The maximum number of worker processes, by default None (one per CPU).
+
+    Returns
+    -------
+    dict[Path, list[SessionRow]]
+        A dictionary mapping each subject directory to its sessions.
+    """
+    initargs = (
+        subject_to_raw_sessions,
+        date_to_raw_sessions,
+        SUBJECT_DIR_TO_CSV_SESSION_DATES,
+        RAW_SESSION_TO_PORT_ENTRY_TIMES,
+    )
+    subject_dir_to_session_rows = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_fp_header_worker, initargs=initargs) as executor:
+        results = executor.map(
+            get_fp_header_variables_in_worker,
+            subject_dirs,
+            [subject_dir.name for subject_dir in subject_dirs],
+            repeat(start_variable),
+        )
+        for subject_dir, (session_rows, new_csv_session_dates, new_port_entry_times) in zip(subject_dirs, results):
+            subject_dir_to_session_rows[subject_dir] = session_rows
+            SUBJECT_DIR_TO_CSV_SESSION_DATES.update(new_csv_session_dates)
+            RAW_SESSION_TO_PORT_ENTRY_TIMES.update(new_port_entry_times)
+    return subject_dir_to_session_rows
+
+
+def init_fp_header_worker(
+    subject_to_raw_sessions: dict[str, tuple[SessionRow, ...]],
+    date_to_raw_sessions: dict[str, tuple[SessionRow, ...]],
+    subject_dir_to_csv_session_dates: dict,
+    raw_session_to_port_entry_times: dict,
+):
+    """Initialize a worker process of get_session_rows_per_subject_dir with the raw session indices and caches."""
+    global FP_HEADER_WORKER_RAW_SESSION_INDICES
+    FP_HEADER_WORKER_RAW_SESSION_INDICES = (subject_to_raw_sessions, date_to_raw_sessions)
+    SUBJECT_DIR_TO_CSV_SESSION_DATES.update(subject_dir_to_csv_session_dates)
+    RAW_SESSION_TO_PORT_ENTRY_TIMES.update(raw_session_to_port_entry_times)
+
+
+def get_fp_header_variables_in_worker(subject_dir: Path, subject_id: str, start_variable: str):
+    """Run get_fp_header_variables in a worker process initialized by init_fp_header_worker.
+
+    Returns
+    -------
+    tuple
+        The subject's sessions, followed by the entries that were added to SUBJECT_DIR_TO_CSV_SESSION_DATES and
+        RAW_SESSION_TO_PORT_ENTRY_TIMES while gathering them.
+    """
+    num_csv_session_dates = len(SUBJECT_DIR_TO_CSV_SESSION_DATES)
+    num_port_entry_times = len(RAW_SESSION_TO_PORT_ENTRY_TIMES)
+    subject_to_raw_sessions, date_to_raw_sessions = FP_HEADER_WORKER_RAW_SESSION_INDICES
+    session_rows = get_fp_header_variables(
+        subject_dir, subject_id, subject_to_raw_sessions, date_to_raw_sessions, start_variable
+    )
+    # New entries are appended, since dicts keep insertion order
+    new_csv_session_dates = dict(islice(SUBJECT_DIR_TO_CSV_SESSION_DATES.items(), num_csv_session_dates, None))
+    new_port_entry_times = dict(islice(RAW_SESSION_TO_PORT_ENTRY_TIMES.items(), num_port_entry_times, None))
+    return session_rows, new_csv_session_dates, new_port_entry_times
+
+
+@lru_cache(maxsize=None)
+def get_raw_session_port_entry_times(
+    *, file_path: Path, start_date: str, start_time: str, box_number: str, start_variable: str
+) -> np.ndarray:
+    """Get the port entry times of a session in the MEDPC_RawFilesbyDate.
+
+    The result is cached, since the same raw session is a candidate match for every csv session on the same date.
+    It is also stored in RAW_SESSION_TO_PORT_ENTRY_TIMES, keyed by the modification time and size of the raw file, so
+    that it can be persisted between runs (see save_fp_matching_cache).
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the raw MedPC file.
+    start_date : str
+        The start date of the session.
+    start_time : str
+        The start time of the session.
+    box_number : str
+        The box number of the session.
+    start_variable : str
+        The variable to use as the start variable for the session.
+
+    Returns
+    -------
+    np.ndarray
+        The port entry times of the session.
+    """
+    stat = file_path.stat()
+    raw_session_key = (
+        str(file_path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        start_date,
+        start_time,
+        box_number,
+        start_variable,
+    )
+    if raw_session_key in RAW_SESSION_TO_PORT_ENTRY_TIMES:
+        return RAW_SESSION_TO_PORT_ENTRY_TIMES[raw_session_key]
+
+    session_conditions = {
+        "Start Date": start_date,
+        "Start Time": start_time,
+        "Box": box_number,
+    }
+    session_dict = read_medpc_file(
+        file_path=file_path,
+        medpc_name_to_info_dict=PORT_ENTRY_TIMES_MEDPC_NAME_TO_INFO_DICT,
+        session_conditions=session_conditions,
+        start_variable=start_variable,
+    )
+    RAW_SESSION_TO_PORT_ENTRY_TIMES[raw_session_key] = session_dict["port_entry_times"]
+    return session_dict["port_entry_times"]
+
+
+def load_fp_matching_cache(cache_file_path: Path):
+    """Load the csv session dates and raw session port entry times saved by a previous run.
+
+    The tables are loaded into SUBJECT_DIR_TO_CSV_SESSION_DATES and RAW_SESSION_TO_PORT_ENTRY_TIMES. Entries whose
+    subject directory or raw file has since been modified or removed are dropped.
+
+    Parameters
+    ----------
+    cache_file_path : Path
+        The path to the pickle file written by save_fp_matching_cache.
+    """
+    cache = read_pickle_cache(cache_file_path)
+    if cache is None:
+        return
+    path_to_fingerprint = {}
+
+    def is_fresh(path: str, fingerprint: tuple) -> bool:
+        if path not in path_to_fingerprint:
+            try:
+                stat = os.stat(path)
+                path_to_fingerprint[path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                path_to_fingerprint[path] = None
+        current_fingerprint = path_to_fingerprint[path]
+        return current_fingerprint is not None and current_fingerprint[: len(fingerprint)] == fingerprint
+
+    for subject_dir_key, csv_session_dates in cache["subject_dir_to_csv_session_dates"].items():
+        subject_dir, mtime_ns = subject_dir_key
+        if is_fresh(subject_dir, (mtime_ns,)):
+            SUBJECT_DIR_TO_CSV_SESSION_DATES[subject_dir_key] = csv_session_dates
+    for raw_session_key, port_entry_times in cache["raw_session_to_port_entry_times"].items():
+        file_path, mtime_ns, size = raw_session_key[:3]
+        if is_fresh(file_path, (mtime_ns, size)):
+            RAW_SESSION_TO_PORT_ENTRY_TIMES[raw_session_key] = port_entry_times
+
+
+def save_fp_matching_cache(cache_file_path: Path):
+    """Save SUBJECT_DIR_TO_CSV_SESSION_DATES and RAW_SESSION_TO_PORT_ENTRY_TIMES for the next run.
+
+    Parameters
+    ----------
+    cache_file_path : Path
+        The path to the pickle file.
+    """
+    cache = dict(
+        subject_dir_to_csv_session_dates=SUBJECT_DIR_TO_CSV_SESSION_DATES,
+        raw_session_to_port_entry_times=RAW_SESSION_TO_PORT_ENTRY_TIMES,
+    )
+    write_pickle_cache(cache_file_path, cache)
+
+
+def read_pickle_cache(cache_file_path: Path):
+    """Read a cache written by write_pickle_cache.
+
+    Parameters
+    ----------
+    cache_file_path : Path
+        The path to the pickle file.
+
+    Returns
+    -------
+    object
+        The cached object, or None if the cache does not exist or cannot be read.
+    """
+    if not cache_file_path.exists():
+        return None
+    try:
+        with open(cache_file_path, mode="rb") as f:
+            return pickle.load(f)
+    except (EOFError, pickle.UnpicklingError, ValueError):  # unreadable cache is treated as missing
+        return None
+
+
+def write_pickle_cache(cache_file_path: Path, obj):
+    """Write an object to a pickle cache file.
+
+    Parameters
+    ----------
+    cache_file_path : Path
+        The path to the pickle file.
+    obj : object
+        The object to cache.
+    """
+    # Write to a temporary file first so that an interrupted run never leaves a truncated cache behind
+    tmp_cache_file_path = cache_file_path.with_name(f"{cache_file_path.name}.tmp")
+    with open(tmp_cache_file_path, mode="wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_cache_file_path, cache_file_path)
+
+
+def get_raw_info(behavior_path: Path, cache_file_path: Optional[Path] = None, max_workers: Optional[int] = None):
     """Get the header info for the MEDPC_RawFilesbyDate.
 
     Parameters
     ----------
     behavior_path : Path
         The path to the behavior directory.
+    cache_file_path : Path, optional
+        The path to a pickle file used to cache the header info between runs, by default None (no caching).
+        The cache is keyed by the path, modification time, and size of every raw file, so it is re-generated whenever
+        a raw file is added, removed, or modified.
+    max_workers : int, optional
+        The number of worker processes used to parse the raw files, by default None (one per CPU core).
 
     Returns
     -------
@@ -1263,14 +1556,79 @@ def get_raw_info(behavior_path: Path):
         A dictionary mapping raw file paths to their info dict, which contains the MedPC variables: Subject, Start Date, Start Time, MSN, and Box.
     """
     raw_files_by_date_path = behavior_path / "MEDPC_RawFilesbyDate"
-    raw_files_by_date = [file for file in raw_files_by_date_path.iterdir() if not file.name.startswith(".")]
-    raw_file_to_info = {}
-    for file in raw_files_by_date:
-        info = get_medpc_variables(file_path=file, variable_names=["Subject", "Start Date", "Start Time", "MSN", "Box"])
-        raw_file_to_info[file] = info
+    with os.scandir(raw_files_by_date_path) as entries:
+        raw_files_by_date = [
+            Path(entry.path) for entry in entries if not entry.name.startswith(".") and entry.is_file()
+        ]
+    if cache_file_path is not None:
+        fingerprint = get_files_fingerprint(raw_files_by_date)
+        cache = read_pickle_cache(cache_file_path)
+        if cache is not None and cache[0] == fingerprint:
+            return cache[1]
+
+    # get_medpc_variables is a pure-python parser, so the files are parsed in parallel processes rather than threads
+    get_raw_file_info = partial(
+        get_medpc_variables, variable_names=["Subject", "Start Date", "Start Time", "MSN", "Box"]
+    )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        infos = executor.map(get_raw_file_info, raw_files_by_date, chunksize=8)
+        raw_file_to_info = dict(zip(raw_files_by_date, infos))
+
+    if cache_file_path is not None:
+        write_pickle_cache(cache_file_path, (fingerprint, raw_file_to_info))
     return raw_file_to_info
 
 
+def get_raw_session_indices(raw_file_to_info: dict[Path, dict]):
+    """Index the sessions in the MEDPC_RawFilesbyDate by subject and by start date.
+
+    Building these indices once lets each subject (or csv date) look up its sessions directly instead of scanning
+    every session of every raw file.
+
+    Parameters
+    ----------
+    raw_file_to_info : dict[Path, dict]
+        A dictionary mapping raw file paths to their info dict, which contains the MedPC variables: Subject, Start Date, Start Time, MSN, and Box.
+
+    Returns
+    -------
+    subject_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping each subject to its sessions (box_number is not filled in).
+    date_to_raw_sessions : dict[str, tuple[SessionRow, ...]]
+        A dictionary mapping each start date to its sessions (subject is not filled in).
+    """
+    subject_to_raw_sessions, date_to_raw_sessions = defaultdict(list), defaultdict(list)
+    for file, info in raw_file_to_info.items():
+        raw_rows = zip(info["Subject"], info["Start Date"], info["Start Time"], info["MSN"], info["Box"])
+        for subject, start_date, start_time, msn, box_number in raw_rows:
+            subject_to_raw_sessions[subject].append(SessionRow(start_date, start_time, msn, file, subject, None))
+            date_to_raw_sessions[start_date].append(SessionRow(start_date, start_time, msn, file, None, box_number))
+    # Frozen into tuples so they can be handed to the cached matching helpers without copying
+    subject_to_raw_sessions = {subject: tuple(rows) for subject, rows in subject_to_raw_sessions.items()}
+    date_to_raw_sessions = {start_date: tuple(rows) for start_date, rows in date_to_raw_sessions.items()}
+    return subject_to_raw_sessions, date_to_raw_sessions
+
+
+def get_files_fingerprint(file_paths: list[Path]):
+    """Get a fingerprint of a group of files that changes whenever any of the files change.
+
+    Parameters
+    ----------
+    file_paths : list[Path]
+        The paths to the files.
+
+    Returns
+    -------
+    tuple
+        A sorted tuple of (file path, modification time in ns, size in bytes) for each file.
+    """
+    fingerprint = []
+    for file_path in file_paths:
+        stat = file_path.stat()
+        fingerprint.append((str(file_path), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(fingerprint))
+
+
 def western_dataset_to_nwb(*, data_dir_path: Path, output_dir_path: Path, verbose: bool = True):
     """Convert all Western Blot data to NWB.
 
@@ -1304,7 +1662,11 @@ def western_dataset_to_nwb(*, data_dir_path: Path, output_dir_path: Path, verbos
 if __name__ == "__main__":
     data_dir_path = Path("/Volumes/T7/CatalystNeuro/NWB/Lerner/raw_data")
     output_dir_path = Path("/Volumes/T7/CatalystNeuro/NWB/Lerner/conversion_nwb")
-    if output_dir_path.exists():
+    # The caches live outside of output_dir_path, so they are kept when it is removed below
+    cache_dir_path = Path("/Volumes/T7/CatalystNeuro/NWB/Lerner/conversion_cache")
+    resume = False  # Set to True to keep the existing NWB files and only convert new or modified sessions
+    if not resume:
+        # shutil.rmtree already walks the tree with os.scandir; ignore_errors also covers a missing output_dir_path
         shutil.rmtree(
             output_dir_path, ignore_errors=True
         )  # ignore errors due to MacOS race condition (https://github.com/python/cpython/issues/81441)
@@ -1312,7 +1674,9 @@ if __name__ == "__main__":
     dataset_to_nwb(
         data_dir_path=data_dir_path,
         output_dir_path=output_dir_path,
+        cache_dir_path=cache_dir_path,
         max_workers=max_workers,
+        skip_existing=resume,
         stub_test=False,
         verbose=False,
     )
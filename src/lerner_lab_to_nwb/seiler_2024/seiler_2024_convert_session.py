@@ -1,14 +1,33 @@
 """Primary script to run to convert example sessions using the NWBConverter."""
 from pathlib import Path
 from typing import Union, Literal, Optional
+import os
 import shutil
+import hashlib
+from copy import deepcopy
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from neuroconv.utils import load_dict_from_file, dict_deep_update
 from datetime import datetime, date, time
 from pytz import timezone
-from tifffile import imread, imwrite
-import matplotlib.pyplot as plt
+import yaml
+import pandas as pd
+from tifffile import imread, imwrite, memmap
+from threadpoolctl import threadpool_limits
 
 from lerner_lab_to_nwb.seiler_2024 import Seiler2024NWBConverter, Seiler2024WesternBlotNWBConverter
+from lerner_lab_to_nwb.seiler_2024.medpc_helpers import read_medpc_file
+
+EDITABLE_METADATA_PATH = Path(__file__).parent / "seiler_2024_metadata.yaml"
+CENTRAL_TIMEZONE = timezone("US/Central")  # the lab's local timezone, used for every session start time
+# The single-line MedPC variables read by the MedPC interface's get_metadata (shared by every session, never modified)
+METADATA_MEDPC_NAME_TO_INFO_DICT = {
+    "Start Date": {"name": "start_date", "is_array": False},
+    "Subject": {"name": "subject", "is_array": False},
+    "Box": {"name": "box", "is_array": False},
+    "Start Time": {"name": "start_time", "is_array": False},
+    "MSN": {"name": "MSN", "is_array": False},
+}
 
 
 def session_to_nwb(
@@ -30,6 +49,7 @@ def session_to_nwb(
     has_demodulated_commanded_voltages: bool = True,
     flip_ttls_lr: bool = False,
     has_port_entry_durations: bool = True,
+    skip_existing: bool = False,
     stub_test: bool = False,
     verbose: bool = True,
 ):
@@ -69,6 +89,9 @@ def session_to_nwb(
         Note that, sometimes the demodulated commanded voltages are in the same array as the demodulated photometry data (Fi1r).
     has_port_entry_durations : bool, optional
         Whether the behavior data has port entry durations, by default True
+    skip_existing : bool, optional
+        Whether to skip the conversion if the output NWB file already exists and its sources and options have not
+        changed since it was converted (see get_session_source_hash), by default False. Stale NWB files are replaced.
     stub_test : bool, optional
         Whether to run a stub test, by default False
     verbose : bool, optional
@@ -79,7 +102,8 @@ def session_to_nwb(
     output_dir_path = Path(output_dir_path)
     if stub_test:
         output_dir_path = output_dir_path / "nwb_stub"
-    output_dir_path.mkdir(parents=True, exist_ok=True)
+    if not output_dir_path.exists():  # every session of a batch shares the output directory, which usually exists
+        output_dir_path.mkdir(parents=True, exist_ok=True)
 
     if experiment_type not in ["FP", "Opto"]:
         raise ValueError(f"Invalid experiment type: {experiment_type}")
@@ -88,48 +112,31 @@ def session_to_nwb(
     conversion_options = {}
 
     # Add Behavior from csv or MedPC
+    behavior_file_path = Path(behavior_file_path)
+    behavior_file_str = os.fspath(behavior_file_path)  # shared by the Behavior/MedPC and Optogenetic source data
     from_csv = behavior_file_path.suffix == ".csv"
     if from_csv:
-        source_data.update(
-            dict(
-                Behavior={
-                    "file_path": str(behavior_file_path),
-                    "has_port_entry_durations": has_port_entry_durations,
-                    "verbose": verbose,
-                }
-            )
-        )
-        conversion_options.update(dict(Behavior={}))
+        source_data["Behavior"] = {
+            "file_path": behavior_file_str,
+            "has_port_entry_durations": has_port_entry_durations,
+            "verbose": verbose,
+        }
+        conversion_options["Behavior"] = {}
     else:
-        metadata_medpc_name_to_info_dict = {
-            "Start Date": {"name": "start_date", "is_array": False},
-            "Subject": {"name": "subject", "is_array": False},
-            "Box": {"name": "box", "is_array": False},
-            "Start Time": {"name": "start_time", "is_array": False},
-            "MSN": {"name": "MSN", "is_array": False},
+        source_data["MedPC"] = {
+            "file_path": behavior_file_str,
+            "session_conditions": session_conditions,
+            "start_variable": start_variable,
+            "metadata_medpc_name_to_info_dict": METADATA_MEDPC_NAME_TO_INFO_DICT,
+            "verbose": verbose,
         }
-        source_data.update(
-            dict(
-                MedPC={
-                    "file_path": str(behavior_file_path),
-                    "session_conditions": session_conditions,
-                    "start_variable": start_variable,
-                    "metadata_medpc_name_to_info_dict": metadata_medpc_name_to_info_dict,
-                    "verbose": verbose,
-                }
-            )
-        )
 
     # Add Fiber Photometry
     if fiber_photometry_folder_path is not None:
-        source_data.update(
-            dict(
-                FiberPhotometry={
-                    "folder_path": str(fiber_photometry_folder_path),
-                    "verbose": verbose,
-                }
-            )
-        )
+        source_data["FiberPhotometry"] = {
+            "folder_path": os.fspath(fiber_photometry_folder_path),
+            "verbose": verbose,
+        }
         photometry_options = dict(
             flip_ttls_lr=flip_ttls_lr,
             has_demodulated_commanded_voltages=has_demodulated_commanded_voltages,
@@ -137,60 +144,80 @@ def session_to_nwb(
         if fiber_photometry_t2:
             photometry_options["t2"] = fiber_photometry_t2
         if second_fiber_photometry_folder_path:
-            photometry_options["second_folder_path"] = str(second_fiber_photometry_folder_path)
-        conversion_options.update(dict(FiberPhotometry=photometry_options))
+            photometry_options["second_folder_path"] = os.fspath(second_fiber_photometry_folder_path)
+        conversion_options["FiberPhotometry"] = photometry_options
 
     # Add Optogenetics
     if experiment_type == "Opto":
-        source_data.update(
-            dict(
-                Optogenetic={
-                    "file_path": str(behavior_file_path),
-                    "session_conditions": session_conditions,
-                    "start_variable": start_variable,
-                    "experimental_group": experimental_group,
-                    "optogenetic_treatment": optogenetic_treatment,
-                    "verbose": verbose,
-                }
-            )
-        )
-        conversion_options.update(dict(Optogenetic={}))
+        source_data["Optogenetic"] = {
+            "file_path": behavior_file_str,
+            "session_conditions": session_conditions,
+            "start_variable": start_variable,
+            "experimental_group": experimental_group,
+            "optogenetic_treatment": optogenetic_treatment,
+            "verbose": verbose,
+        }
+        conversion_options["Optogenetic"] = {}
 
     # Add Excel-based Metadata
     metadata_path = data_dir_path / "MouseDemographicsCorrected.xlsx"
-    source_data.update(
-        dict(
-            Metadata={
-                "file_path": str(metadata_path),
-                "subject_id": subject_id,
-                "verbose": verbose,
-            }
-        )
+    source_data["Metadata"] = {
+        "file_path": os.fspath(metadata_path),
+        "subject_id": subject_id,
+        "verbose": verbose,
+    }
+    conversion_options["Metadata"] = {}
+
+    # The NWB file path only depends on the session start time, which is read from the behavior file's header so that
+    # up-to-date sessions are skipped before the converter and its metadata are built
+    start_date, start_time = get_session_start_date_and_time(
+        behavior_file_path=behavior_file_path, session_conditions=session_conditions, start_variable=start_variable
     )
-    conversion_options.update(dict(Metadata={}))
+    session_start_time = parse_medpc_datetime(start_date=start_date, start_time=start_time)
+    session_start_time_id = session_start_time.strftime("%Y-%m-%dT%H-%M-%S")  # ':' is not allowed in file names
+    if optogenetic_treatment is None:
+        session_id = f"{experiment_type}_{experimental_group}_{session_start_time_id}"
+    else:
+        session_id = f"{experiment_type}-{experimental_group}-{optogenetic_treatment}-{session_start_time_id}"
+    nwbfile_path = output_dir_path / f"sub-{subject_id}_ses-{session_id}.nwb"
+    source_hash = get_session_source_hash(
+        source_paths=[
+            behavior_file_path,
+            metadata_path,
+            fiber_photometry_folder_path,
+            second_fiber_photometry_folder_path,
+        ],
+        session_options=dict(
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            fiber_photometry_t2=fiber_photometry_t2,
+            has_demodulated_commanded_voltages=has_demodulated_commanded_voltages,
+            flip_ttls_lr=flip_ttls_lr,
+            has_port_entry_durations=has_port_entry_durations,
+            stub_test=stub_test,
+        ),
+    )
+    source_hash_path = nwbfile_path.parent / f"{nwbfile_path.name}.srchash"
+    if skip_existing:
+        if nwbfile_is_up_to_date(nwbfile_path=nwbfile_path, source_hash_path=source_hash_path, source_hash=source_hash):
+            if verbose:
+                print(f"Skipping {nwbfile_path.name} because it has already been converted.")
+            return
+        if nwbfile_path.exists():  # the NWB file is stale, and run_conversion would append to it rather than replace it
+            nwbfile_path.unlink()
 
     converter = Seiler2024NWBConverter(source_data=source_data, verbose=verbose)
     metadata = converter.get_metadata()
 
     # Update default metadata with the editable in the corresponding yaml file
-    editable_metadata_path = Path(__file__).parent / "seiler_2024_metadata.yaml"
-    editable_metadata = load_dict_from_file(editable_metadata_path)
-    metadata = dict_deep_update(metadata, editable_metadata)
+    # Both dicts are fresh copies, so they are merged in place instead of being deep copied at every level
+    metadata = dict_deep_update(metadata, load_editable_metadata(), copy=False)
 
     behavioral_metadata_key = "Behavior" if from_csv else "MedPC"
-    start_date = datetime.strptime(metadata[behavioral_metadata_key]["start_date"], "%m/%d/%y").date()
-    start_time = datetime.strptime(metadata[behavioral_metadata_key]["start_time"], "%H:%M:%S").time()
-    session_start_time = datetime.combine(start_date, start_time)
-    if optogenetic_treatment is None:
-        session_id = f"{experiment_type}_{experimental_group}_{session_start_time.isoformat().replace(':', '-')}"
-    else:
-        session_id = f"{experiment_type}-{experimental_group}-{optogenetic_treatment}-{session_start_time.isoformat().replace(':', '-')}"
     metadata["NWBFile"]["session_id"] = session_id
-    cst = timezone("US/Central")
-    metadata["NWBFile"]["session_start_time"] = session_start_time.replace(tzinfo=cst)
+    metadata["NWBFile"]["session_start_time"] = session_start_time.replace(tzinfo=CENTRAL_TIMEZONE)
     msn = metadata[behavioral_metadata_key]["MSN"]
     metadata["NWBFile"]["session_description"] = metadata["MedPC"]["msn_to_session_description"][msn]
-    nwbfile_path = output_dir_path / f"sub-{subject_id}_ses-{session_id}.nwb"
 
     if not from_csv:
         msn = metadata["MedPC"]["MSN"]
@@ -219,6 +246,252 @@ def session_to_nwb(
     converter.run_conversion(
         metadata=metadata, nwbfile_path=nwbfile_path, conversion_options=conversion_options, verbose=verbose
     )
+    source_hash_path.write_text(source_hash)
+
+
+def get_session_start_date_and_time(
+    *, behavior_file_path: Path, session_conditions: dict, start_variable: str
+) -> tuple[str, str]:
+    """Read the start date and time of a session from the header of its behavior file.
+
+    The start date and time are read the same way as by the Behavior and MedPC interfaces, but without reading the
+    rest of the session.
+
+    Parameters
+    ----------
+    behavior_file_path : Path
+        Path to the behavior file (.csv or MedPC text file).
+    session_conditions : dict
+        The conditions that define the session in the MedPC file (ignored for csv files).
+    start_variable : str
+        The name of the variable that starts the session in the MedPC file (ignored for csv files).
+
+    Returns
+    -------
+    tuple[str, str]
+        The start date (ex. '11/09/18') and start time (ex. '10:34:18') of the session.
+    """
+    if behavior_file_path.suffix == ".csv":
+        session_df = pd.read_csv(
+            behavior_file_path, dtype=str, nrows=1, usecols=lambda column: column in ("Start Date", "Start Time")
+        )
+        start_date = (
+            session_df["Start Date"][0]
+            if "Start Date" in session_df.columns
+            else behavior_file_path.stem.split("_")[1].replace("-", "/")
+        )
+        start_time = session_df["Start Time"][0] if "Start Time" in session_df.columns else "00:00:00"
+        return start_date, start_time
+    session_dict = read_medpc_file(
+        file_path=behavior_file_path,
+        medpc_name_to_info_dict={
+            medpc_name: METADATA_MEDPC_NAME_TO_INFO_DICT[medpc_name] for medpc_name in ("Start Date", "Start Time")
+        },
+        session_conditions=session_conditions,
+        start_variable=start_variable,
+    )
+    return session_dict["start_date"], session_dict["start_time"]
+
+
+def nwbfile_is_up_to_date(*, nwbfile_path: Path, source_hash_path: Path, source_hash: str) -> bool:
+    """Check whether an NWB file exists and was converted from the current version of its sources.
+
+    Parameters
+    ----------
+    nwbfile_path : Path
+        Path to the NWB file.
+    source_hash_path : Path
+        Path to the file where the source hash of the NWB file was saved after its conversion.
+    source_hash : str
+        The current source hash of the session (see get_session_source_hash).
+
+    Returns
+    -------
+    bool
+        True if the NWB file exists and its saved source hash matches source_hash, False otherwise.
+    """
+    if not nwbfile_path.exists() or not source_hash_path.exists():
+        return False
+    return source_hash_path.read_text() == source_hash
+
+
+def get_session_source_hash(*, source_paths: list[Optional[Union[str, Path]]], session_options: dict) -> str:
+    """Get a hash of a session's sources that changes whenever the NWB file needs to be converted again.
+
+    The hash covers the modification time and size of the source files, of every file inside the source folders and
+    of the editable metadata, as well as the options that change the contents of the NWB file.
+
+    Parameters
+    ----------
+    source_paths : list[Optional[Union[str, Path]]]
+        Paths to the files and folders the NWB file is converted from. None entries are ignored.
+    session_options : dict
+        The session_to_nwb arguments that change the contents of the NWB file.
+
+    Returns
+    -------
+    str
+        The hexadecimal blake2b hash of the session's sources.
+    """
+    source_fingerprint = []
+    for source_path in [EDITABLE_METADATA_PATH] + [Path(path) for path in source_paths if path is not None]:
+        source_fingerprint.extend(get_path_fingerprint(os.fspath(source_path)))
+    source_key = repr((source_fingerprint, sorted(session_options.items())))
+    return hashlib.blake2b(source_key.encode(), digest_size=16).hexdigest()
+
+
+def get_path_fingerprint(path: str) -> list[tuple[str, int, int]]:
+    """Get the path, modification time and size of a file, or of every file inside a folder.
+
+    The modification time of a folder only changes when entries are added to or removed from it, so the files inside
+    folders (and their subfolders) are fingerprinted individually.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file or folder.
+
+    Returns
+    -------
+    list[tuple[str, int, int]]
+        The sorted (path, modification time in ns, size) of the file or of every file inside the folder.
+    """
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return [(path, stat.st_mtime_ns, stat.st_size)]
+    fingerprint = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                fingerprint.extend(get_path_fingerprint(entry.path))
+            else:
+                stat = entry.stat()
+                fingerprint.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    return sorted(fingerprint)
+
+
+def load_editable_metadata() -> dict:
+    """Load the editable metadata from seiler_2024_metadata.yaml.
+
+    The yaml file is only parsed again when it is modified. A deep copy is returned, since the metadata is modified in
+    place during each conversion.
+
+    Returns
+    -------
+    dict
+        The editable metadata.
+    """
+    mtime_ns = EDITABLE_METADATA_PATH.stat().st_mtime_ns
+    return deepcopy(load_cached_dict_from_file(file_path=EDITABLE_METADATA_PATH, mtime_ns=mtime_ns))
+
+
+@lru_cache(maxsize=4)
+def load_cached_dict_from_file(*, file_path: Path, mtime_ns: int) -> dict:
+    """Load a dictionary from a yaml or json file, parsing each version of the file only once.
+
+    Yaml files are parsed with the LibYAML bindings when PyYAML was built with them. The returned dict must not be
+    modified.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the yaml or json file.
+    mtime_ns : int
+        The modification time of the file in ns, so that the file is parsed again whenever it is modified.
+
+    Returns
+    -------
+    dict
+        The contents of the file.
+    """
+    if file_path.suffix not in (".yml", ".yaml"):
+        return load_dict_from_file(file_path)
+    with open(file_path, "r") as f:
+        return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def get_session_conditions(*, start_datetime: datetime) -> dict:
+    """Get the MedPC session conditions (Start Date and Start Time) for a session start datetime.
+
+    The fields are zero-padded directly, which is cheaper than parsing a strftime format for every session.
+
+    Parameters
+    ----------
+    start_datetime : datetime
+        The start datetime of the session.
+
+    Returns
+    -------
+    dict
+        The session conditions, ex. {'Start Date': '04/09/19', 'Start Time': '10:34:30'}.
+    """
+    return {
+        "Start Date": f"{start_datetime.month:02d}/{start_datetime.day:02d}/{start_datetime.year % 100:02d}",
+        "Start Time": f"{start_datetime.hour:02d}:{start_datetime.minute:02d}:{start_datetime.second:02d}",
+    }
+
+
+def parse_medpc_datetime(*, start_date: str, start_time: str) -> datetime:
+    """Parse a MedPC start date and start time into a datetime.
+
+    Parameters
+    ----------
+    start_date : str
+        The start date in the format 'MM/DD/YY' (ex. '11/09/18').
+    start_time : str
+        The start time in the format 'HH:MM:SS' (ex. '10:34:30').
+
+    Returns
+    -------
+    datetime
+        The start datetime of the session.
+    """
+    # Zero-padded dates and times (as written by MedPC) are sliced directly, which is much faster than strptime
+    if len(start_date) == 8 and len(start_time) == 8 and start_date[2::3] == "//" and start_time[2::3] == "::":
+        year = int(start_date[6:8])
+        year += 2000 if year < 69 else 1900  # same pivot year as strptime's %y
+        return datetime(
+            year,
+            int(start_date[0:2]),
+            int(start_date[3:5]),
+            int(start_time[0:2]),
+            int(start_time[3:5]),
+            int(start_time[6:8]),
+        )
+    return datetime.strptime(f"{start_date} {start_time}", "%m/%d/%y %H:%M:%S")
+
+
+def sessions_to_nwb(
+    *,
+    session_to_nwb_args_per_session: list[dict],
+    max_workers: Optional[int] = None,
+):
+    """Convert several sessions to NWB concurrently in worker processes.
+
+    Parameters
+    ----------
+    session_to_nwb_args_per_session : list[dict]
+        A list of dictionaries containing the arguments for session_to_nwb for each session.
+    max_workers : int, optional
+        The maximum number of worker processes, by default None (one per CPU core).
+    """
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=limit_worker_threads) as executor:
+        futures = [
+            executor.submit(session_to_nwb, **session_to_nwb_kwargs)
+            for session_to_nwb_kwargs in session_to_nwb_args_per_session
+        ]
+        for future in futures:
+            future.result()  # re-raise any conversion error
+
+
+def limit_worker_threads():
+    """Limit the numerical libraries (BLAS, OpenMP) of a worker process to a single thread.
+
+    Each worker converts a whole session, so multithreaded numerical libraries in every worker would oversubscribe the
+    CPU cores. The limit is applied inside the worker, so it also holds for forked workers that inherit the thread
+    pools of the parent process.
+    """
+    threadpool_limits(limits=1)
 
 
 def western_blot_to_nwb(
@@ -240,7 +513,8 @@ def western_blot_to_nwb(
     """
     file_path = Path(file_path)
     output_dir_path = Path(output_dir_path)
-    output_dir_path.mkdir(parents=True, exist_ok=True)
+    if not output_dir_path.exists():
+        output_dir_path.mkdir(parents=True, exist_ok=True)
 
     source_data = dict(WesternBlot={"file_path": str(file_path), "verbose": verbose})
     conversion_options = dict(WesternBlot={})
@@ -249,12 +523,12 @@ def western_blot_to_nwb(
     metadata = converter.get_metadata()
 
     # Update default metadata with the editable in the corresponding yaml file
-    editable_metadata_path = Path(__file__).parent / "seiler_2024_metadata.yaml"
-    editable_metadata = load_dict_from_file(editable_metadata_path)
-    metadata = dict_deep_update(metadata, editable_metadata)
+    # Both dicts are fresh copies, so they are merged in place instead of being deep copied at every level
+    metadata = dict_deep_update(metadata, load_editable_metadata(), copy=False)
 
-    cst = timezone("US/Central")
-    metadata["NWBFile"]["session_start_time"] = metadata["NWBFile"]["session_start_time"].replace(tzinfo=cst)
+    metadata["NWBFile"]["session_start_time"] = metadata["NWBFile"]["session_start_time"].replace(
+        tzinfo=CENTRAL_TIMEZONE
+    )
 
     nwbfile_path = output_dir_path / f"{file_path.stem}.nwb"
 
@@ -288,14 +562,18 @@ def split_western_blot(*, file_path: Union[str, Path]):
         "Male_DMS_DAT.tif": (slice(50, 300), slice(300, None)),
     }
     file_path = Path(file_path)
-    western_blot = imread(file_path)
+    try:  # uncompressed images are mapped directly, so only the sliced columns are read
+        western_blot = memmap(file_path, mode="r")
+    except ValueError:  # compressed or non-contiguous image data cannot be memory-mapped
+        western_blot = imread(file_path)
     wt_slice, dat_slice = raw_western_file_names_to_slices[file_path.name]
     wt_western_blot = western_blot[:, wt_slice]
     dat_western_blot = western_blot[:, dat_slice]
     wt_file_path = file_path.parent / f"{file_path.stem}_WT.tif"
     dat_file_path = file_path.parent / f"{file_path.stem}_DAT-IRES-Cre-het.tif"
-    imwrite(wt_file_path, wt_western_blot)
-    imwrite(dat_file_path, dat_western_blot)
+    # zlib (deflate) is lossless and decoded by tifffile without extra codecs
+    imwrite(wt_file_path, wt_western_blot, compression="zlib", compressionargs={"level": 5})
+    imwrite(dat_file_path, dat_western_blot, compression="zlib", compressionargs={"level": 5})
 
     return wt_file_path, dat_file_path
 
@@ -305,8 +583,10 @@ if __name__ == "__main__":
     data_dir_path = Path("/Volumes/T7/CatalystNeuro/NWB/Lerner/raw_data")
     output_dir_path = Path("/Volumes/T7/CatalystNeuro/NWB/Lerner/conversion_nwb")
     stub_test = False
+    resume = False  # Set to True to keep the existing NWB files and only convert new or modified sessions
+    session_to_nwb_args_per_session = []  # Each dict contains the args for session_to_nwb for an example session
 
-    if output_dir_path.exists():
+    if output_dir_path.exists() and any(output_dir_path.iterdir()) and not resume:
         shutil.rmtree(
             output_dir_path, ignore_errors=True
         )  # ignore errors due to MacOS race condition (https://github.com/python/cpython/issues/81441)
@@ -324,21 +604,20 @@ if __name__ == "__main__":
         / f"{subject_id}"
         / f"{subject_id}"
     )
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Shock session
@@ -346,10 +625,7 @@ if __name__ == "__main__":
     experimental_group = "RR20"
     subject_id = "96.259"
     start_datetime = datetime(2019, 4, 18, 9, 28, 20)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -359,16 +635,18 @@ if __name__ == "__main__":
         / f"{subject_id}"
         / f"{subject_id}"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # session with lots of trailing whitespace
@@ -376,10 +654,7 @@ if __name__ == "__main__":
     experimental_group = "PR"
     subject_id = "141.308"
     start_datetime = datetime(2019, 8, 1, 14, 1, 17)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -389,16 +664,18 @@ if __name__ == "__main__":
         / f"{subject_id}"
         / f"{subject_id}"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # session with missing medpc file and missing subject info, but has csv file
@@ -408,8 +685,7 @@ if __name__ == "__main__":
     start_datetime = datetime(2018, 11, 9, 11, 46, 33)
     box = "1"
     session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
+        **get_session_conditions(start_datetime=start_datetime),
         "Box": box,
     }
     start_variable = "Start Date"
@@ -420,16 +696,18 @@ if __name__ == "__main__":
         / "MEDPC_RawFilesbyDate"
         / f"{start_datetime.date().isoformat()}"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Behavior session from csv file
@@ -447,16 +725,18 @@ if __name__ == "__main__":
         / f"{subject_id}"
         / f"{subject_id}_{start_datetime.strftime('%m-%d-%y')}.csv"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # session with missing medpc file
@@ -465,8 +745,7 @@ if __name__ == "__main__":
     subject_id = "75.214"
     start_datetime = datetime(2018, 10, 29, 12, 41, 44)
     session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
+        **get_session_conditions(start_datetime=start_datetime),
         "Subject": subject_id,
     }
     start_variable = "Start Date"
@@ -485,18 +764,20 @@ if __name__ == "__main__":
         / f"Early RI60"
         / f"Photo_{subject_id.split('.')[0]}_{subject_id.split('.')[1]}-181029-124815"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        has_demodulated_commanded_voltages=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            has_demodulated_commanded_voltages=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Fiber Photometry session
@@ -504,10 +785,7 @@ if __name__ == "__main__":
     experimental_group = "PS"
     subject_id = "112.283"
     start_datetime = datetime(2019, 6, 20, 9, 32, 4)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -525,18 +803,20 @@ if __name__ == "__main__":
         / f"Early RI60"
         / f"Photo_{subject_id.split('.')[0]}_{subject_id.split('.')[1]}-190620-093542"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        has_demodulated_commanded_voltages=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            has_demodulated_commanded_voltages=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Fiber Photometry session without unrewarded port entries
@@ -544,10 +824,7 @@ if __name__ == "__main__":
     experimental_group = "PS"
     subject_id = "249.391"
     start_datetime = datetime(2020, 7, 21, 11, 42, 49)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -565,18 +842,20 @@ if __name__ == "__main__":
         / f"Late RI60"
         / f"Photo_{subject_id.split('.')[0]}_{subject_id.split('.')[1]}-200721-120136"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        has_port_entry_durations=False,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            has_port_entry_durations=False,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Fiber Photometry session with only Fi1r (no Fi1d) BUT has demodulated commanded voltages in Fi1r
@@ -584,10 +863,7 @@ if __name__ == "__main__":
     experimental_group = "DPR"
     subject_id = "333.393"
     start_datetime = datetime(2020, 7, 13, 11, 57, 48)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -605,29 +881,28 @@ if __name__ == "__main__":
         / f"Early"
         / f"Photo_{subject_id.split('.')[0]}_{subject_id.split('.')[1]}-200713-121027"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        has_port_entry_durations=False,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        has_demodulated_commanded_voltages=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            has_port_entry_durations=False,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            has_demodulated_commanded_voltages=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
     # Fiber Photometry session with partial corruption AND missing Fi1d AND stitching two sessions together
     experiment_type = "FP"
     experimental_group = "PS"
     subject_id = "139.298"
     start_datetime = datetime(2019, 9, 12, 9, 33, 41)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -647,20 +922,22 @@ if __name__ == "__main__":
     )
     fiber_photometry_t2 = 2267.0
     second_fiber_photometry_folder_path = fiber_photometry_folder_path.parent / "Photo_139_298-190912-103544"
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        second_fiber_photometry_folder_path=second_fiber_photometry_folder_path,
-        fiber_photometry_t2=fiber_photometry_t2,
-        has_demodulated_commanded_voltages=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            second_fiber_photometry_folder_path=second_fiber_photometry_folder_path,
+            fiber_photometry_t2=fiber_photometry_t2,
+            has_demodulated_commanded_voltages=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Fiber Photometry session with swapped left and right TTLs and missing Fi1d BUT Fi1r has demodulated commanded voltages
@@ -668,10 +945,7 @@ if __name__ == "__main__":
     experimental_group = "PS"
     subject_id = "140.306"
     start_datetime = datetime(2019, 8, 9, 12, 10, 58)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -689,19 +963,21 @@ if __name__ == "__main__":
         / f"Early RI60"
         / f"Photo_{subject_id.split('.')[0]}_{subject_id.split('.')[1]}-190809-121107"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        flip_ttls_lr=True,
-        has_demodulated_commanded_voltages=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            flip_ttls_lr=True,
+            has_demodulated_commanded_voltages=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Fiber Photometry session: Probe Test Habit Training TTL
@@ -709,10 +985,7 @@ if __name__ == "__main__":
     experimental_group = "PR"
     subject_id = "89.247"
     start_datetime = datetime(2019, 3, 8, 10, 59, 10)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -729,18 +1002,20 @@ if __name__ == "__main__":
         / f"Early RI60"
         / f"Photo_89_247-190308-095258"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        has_demodulated_commanded_voltages=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            has_demodulated_commanded_voltages=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Fiber Photometry session with missing RNRW
@@ -748,10 +1023,7 @@ if __name__ == "__main__":
     experimental_group = "PS"
     subject_id = "332.393"
     start_datetime = datetime(2020, 7, 28, 12, 4, 1)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -777,19 +1049,21 @@ if __name__ == "__main__":
         / f"Late RI60"
         / f"Photo_{subject_id.split('.')[0]}_{subject_id.split('.')[1]}-200728-123314"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        has_port_entry_durations=False,
-        fiber_photometry_folder_path=fiber_photometry_folder_path,
-        second_fiber_photometry_folder_path=second_fiber_photometry_folder_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            has_port_entry_durations=False,
+            fiber_photometry_folder_path=fiber_photometry_folder_path,
+            second_fiber_photometry_folder_path=second_fiber_photometry_folder_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            stub_test=stub_test,
+        )
     )
 
     # Example DMS-Inhibitory Opto session
@@ -798,10 +1072,7 @@ if __name__ == "__main__":
     optogenetic_treatment = "NpHR"
     subject_id = "112.415"
     start_datetime = datetime(2020, 10, 21, 13, 8, 39)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -811,18 +1082,20 @@ if __name__ == "__main__":
         / f"Halo"
         / f"{subject_id}"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        has_port_entry_durations=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            has_port_entry_durations=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Example DMS-Excitatory Opto session
@@ -831,10 +1104,7 @@ if __name__ == "__main__":
     optogenetic_treatment = "ChR2"
     subject_id = "119.416"
     start_datetime = datetime(2020, 10, 20, 13, 0, 57)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -843,18 +1113,20 @@ if __name__ == "__main__":
         / f"{optogenetic_treatment}"
         / f"{subject_id}"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        has_port_entry_durations=False,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            has_port_entry_durations=False,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Example DLS-Excitatory Opto session
@@ -863,10 +1135,7 @@ if __name__ == "__main__":
     optogenetic_treatment = "ChR2"
     subject_id = "242.388"
     start_datetime = datetime(2020, 6, 26, 12, 10, 40)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -875,17 +1144,19 @@ if __name__ == "__main__":
         / f"{optogenetic_treatment}"
         / f"{subject_id}"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Opto session with both left and right rewards
@@ -894,10 +1165,7 @@ if __name__ == "__main__":
     optogenetic_treatment = "ChR2"
     subject_id = "281.402"
     start_datetime = datetime(2020, 9, 23, 12, 36, 30)
-    session_conditions = {
-        "Start Date": start_datetime.strftime("%m/%d/%y"),
-        "Start Time": start_datetime.strftime("%H:%M:%S"),
-    }
+    session_conditions = get_session_conditions(start_datetime=start_datetime)
     start_variable = "Start Date"
     behavior_file_path = (
         data_dir_path
@@ -906,17 +1174,19 @@ if __name__ == "__main__":
         / f"{optogenetic_treatment}"
         / "2020-09-23_12h36m_Subject 281.402"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Opto session from csv file
@@ -935,17 +1205,19 @@ if __name__ == "__main__":
         / f"{subject_id}"
         / f"{subject_id}_{start_datetime.strftime('%m-%d-%y')}.csv"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Opto session from csv file with scrambled optogenetic stimulation
@@ -964,17 +1236,19 @@ if __name__ == "__main__":
         / f"{subject_id.replace('.', '_')}"
         / f"{subject_id}_{start_datetime.strftime('%m-%d-%y')}.csv"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Opto Omission Probe session from csv file
@@ -993,17 +1267,19 @@ if __name__ == "__main__":
         / f"{subject_id.replace('.', '_')}"
         / f"{subject_id}_{start_datetime.strftime('%m-%d-%y')}.csv"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
     )
 
     # Opto session with mixed dtype
@@ -1022,17 +1298,27 @@ if __name__ == "__main__":
         / f"{subject_id}"
         / f"{subject_id}_{start_datetime.strftime('%m-%d-%y')}.csv"
     )
-    session_to_nwb(
-        data_dir_path=data_dir_path,
-        output_dir_path=output_dir_path,
-        behavior_file_path=behavior_file_path,
-        subject_id=subject_id,
-        session_conditions=session_conditions,
-        start_variable=start_variable,
-        experiment_type=experiment_type,
-        experimental_group=experimental_group,
-        optogenetic_treatment=optogenetic_treatment,
-        stub_test=stub_test,
+    session_to_nwb_args_per_session.append(
+        dict(
+            data_dir_path=data_dir_path,
+            output_dir_path=output_dir_path,
+            behavior_file_path=behavior_file_path,
+            subject_id=subject_id,
+            session_conditions=session_conditions,
+            start_variable=start_variable,
+            experiment_type=experiment_type,
+            experimental_group=experimental_group,
+            optogenetic_treatment=optogenetic_treatment,
+            stub_test=stub_test,
+        )
+    )
+
+    # The example sessions are independent, so they are converted in parallel
+    sessions_to_nwb(
+        session_to_nwb_args_per_session=[
+            dict(session_to_nwb_kwargs, skip_existing=resume, verbose=False)  # parallel prints would interleave
+            for session_to_nwb_kwargs in session_to_nwb_args_per_session
+        ],
     )
 
     # Western blot
@@ -11,6 +11,8 @@ from pynwb.behavior import BehavioralEpochs, IntervalSeries
 from pathlib import Path
 from typing import Optional
 
+from .medpc_helpers import trim_trailing_zeros
+
 
 class Seiler2024CSVBehaviorInterface(BaseTemporalAlignmentInterface):
     """Behavior interface for seiler_2024 conversion"""
@@ -110,7 +112,7 @@ class Seiler2024CSVBehaviorInterface(BaseTemporalAlignmentInterface):
         session_df = pd.read_csv(self.source_data["file_path"], dtype=session_dtypes)
         timestamps_dict = {}
         for csv_name, dict_name in csv_name_to_dict_name.items():
-            timestamps_dict[dict_name] = np.trim_zeros(session_df[csv_name].dropna().values, trim="b")
+            timestamps_dict[dict_name] = trim_trailing_zeros(session_df[csv_name].dropna().values)
         return timestamps_dict
 
     def get_timestamps(self) -> dict[str, np.ndarray]:
@@ -184,7 +186,7 @@ class Seiler2024CSVBehaviorInterface(BaseTemporalAlignmentInterface):
         session_df = pd.read_csv(self.source_data["file_path"], dtype=session_dtypes)
         session_dict = {}
         for csv_name, dict_name in csv_name_to_dict_name.items():
-            session_dict[dict_name] = np.trim_zeros(session_df[csv_name].dropna().values, trim="b")
+            session_dict[dict_name] = trim_trailing_zeros(session_df[csv_name].dropna().values)
         aligned_timestamps_dict = self.get_timestamps()
         for name in self.source_data["aligned_timestamp_names"]:
             session_dict[name] = aligned_timestamps_dict[name]
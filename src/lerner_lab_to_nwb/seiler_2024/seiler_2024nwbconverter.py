@@ -12,7 +12,7 @@ from lerner_lab_to_nwb.seiler_2024 import (
     Seiler2024WesternBlotInterface,
 )
 from .medpcdatainterface import MedPCInterface
-from .medpc_helpers import read_medpc_file
+from .medpc_helpers import read_medpc_file, trim_trailing_zeros
 import numpy as np
 import pandas as pd
 from tdt import read_block
@@ -83,7 +83,7 @@ class Seiler2024NWBConverter(NWBConverter):
             session_df = pd.read_csv(self.source_data["file_path"], dtype=session_dtypes)
             session_dict = {}
             for csv_name, dict_name in csv_name_to_dict_name.items():
-                session_dict[dict_name] = np.trim_zeros(session_df[csv_name].dropna().values, trim="b")
+                session_dict[dict_name] = trim_trailing_zeros(session_df[csv_name].dropna().values)
 
         # Read Fiber Photometry Data
         t2 = conversion_options["FiberPhotometry"].get("t2", None)
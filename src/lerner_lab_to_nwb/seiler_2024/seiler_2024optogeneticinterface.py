@@ -10,7 +10,7 @@ from datetime import datetime, time
 from pathlib import Path
 import pandas as pd
 
-from .medpc_helpers import read_medpc_file
+from .medpc_helpers import read_medpc_file, trim_trailing_zeros
 
 
 class Seiler2024OptogeneticInterface(BaseDataInterface):
@@ -99,11 +99,11 @@ class Seiler2024OptogeneticInterface(BaseDataInterface):
             session_df = pd.read_csv(self.source_data["file_path"], dtype=session_dtypes)
             session_dict = {}
             for csv_name, dict_name in csv_name_to_dict_name.items():
-                session_dict[dict_name] = np.trim_zeros(session_df[csv_name].dropna().values, trim="b")
+                session_dict[dict_name] = trim_trailing_zeros(session_df[csv_name].dropna().values)
             if ("Scram" in metadata["Behavior"]["MSN"] or "SCRAM" in metadata["Behavior"]["MSN"]) and (
                 "Z" in session_df.columns
             ):
-                session_dict["optogenetic_stimulation_times"] = np.trim_zeros(session_df["Z"].dropna().values, trim="b")
+                session_dict["optogenetic_stimulation_times"] = trim_trailing_zeros(session_df["Z"].dropna().values)
         else:
             msn = metadata["MedPC"]["MSN"]
             medpc_name_to_output_name = metadata["MedPC"]["msn_to_medpc_name_to_output_name"][msn]